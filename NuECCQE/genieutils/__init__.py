@@ -0,0 +1,3 @@
+"""
+Shared utilities for working with GENIE cross section spline files.
+"""
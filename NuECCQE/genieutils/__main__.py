@@ -0,0 +1,5 @@
+import sys
+
+from genieutils.cli import main
+
+sys.exit(main())
@@ -0,0 +1,140 @@
+'''
+Sum the cross sections of the splines in GENIE spline files (circa 2.9.N)
+by neutrino flavor, current and target, and write each total to a text file.
+Usage:
+    python -m genieutils sum <-f>/<-flag> <arg>
+    (or python add_cross_sections.py <-f>/<-flag> <arg>)
+                           -s / --splines spline1,spline2,spline3,...
+                           -t / --target      : Target(s) (e.g. 1000060120 or
+                                                1000060120,1000010010)
+                           -n / --min         : Min energy (default 0)
+                           -x / --max         : Max energy (default 120 GeV)
+                                --nc          : Neutral current (CC default)
+                                --currents    : Current(s) (e.g. CC,NC);
+                                                overrides --nc
+                           -j / --jobs        : Parse the spline file(s) in
+                                                this many processes
+                                --no-cache    : Don't read/write the binary
+                                                spline cache
+
+Available targets:
+    1000010010 (Hydrogen)
+    1000060120 (Carbon)
+    1000080160 (Oxygen)
+'''
+from __future__ import print_function
+
+from genieutils.cli import split_list
+from genieutils.spline import current_code, flavor_name, target_name
+from genieutils.units import cm2
+
+
+def sum_cross_section_dicts(splines):
+    """
+    Perform a bin by bin summation. Returns a tuple of (energies, xsecs)
+    arrays, or None if there is nothing to sum. Splines that do not share a
+    knot grid are resampled onto the union of their grids.
+    """
+    from genieutils.grids import spline_grid, sum_splines
+
+    if len(splines) == 0:
+        return None
+    return sum_splines([s.energies for s in splines],
+                       [s.xsecs for s in splines],
+                       [spline_grid(s) for s in splines])
+
+
+def bucket_splines(splines):
+    """
+    Group Splines into a dictionary of lists keyed on the PDG and current
+    codes (nu, current, tgt), in a single pass.
+    """
+    buckets = {}
+    for s in splines:
+        buckets.setdefault((s.nu, s.current, s.tgt), []).append(s)
+    return buckets
+
+
+def write_sum_of_xsecs(xsecs, flavor, current, target, min_e, max_e):
+    """
+    write the xsecs to file, with filename based on flavor, current, and
+    target in the e-range defined by min_e and max_e
+    """
+    import re
+
+    import numpy as np
+
+    if xsecs is None:
+        return
+
+    fname = flavor + '_' + current + '_' + target_name(int(target)) + '.txt'
+    fname = re.sub(r'\s+', '_', fname)
+
+    energies, xs = xsecs
+    in_range = (energies > min_e) & (energies < max_e)
+    energies = energies[in_range]
+    xs = xs[in_range] / cm2 / 1e-38
+    xssum = xs.sum()
+    seen_max_e = energies[-1] if len(energies) else 0.0
+
+    with open(fname, "w") as f:
+        np.savetxt(f, np.column_stack((energies, xs)),
+                   fmt='%10.5f:  %12.8f x 10^(-38) cm2')
+
+        print("Erange " + str(min_e) + " to " + str(seen_max_e) + " sum = " +
+              str(xssum) + " x 10^(-38) cm^2", file=f)
+
+
+def main(argv=None):
+    from optparse import OptionParser
+
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('-s', '--splines', type='string', action='callback',
+                      callback=split_list, dest='spline_files')
+    parser.add_option('-t', '--target', type='string', action='callback',
+                      callback=split_list, dest='targets',
+                      help=r'Target PDG(s)')
+    parser.add_option('-n', '--min', type='float', default=0.0,
+                      help=r'Minimum energy', dest='min_e')
+    parser.add_option('-x', '--max', type='float', default=120.0,
+                      help=r'Maximum energy', dest='max_e')
+    parser.add_option('--nc', default=True, action='store_false',
+                      help=r'NC reactions', dest='is_cc')
+    parser.add_option('--currents', type='string', action='callback',
+                      callback=split_list, dest='currents',
+                      help=r'Currents (CC and/or NC)')
+    parser.add_option('-j', '--jobs', type='int', default=1,
+                      help=r'Number of parsing processes', dest='jobs')
+    parser.add_option('--no-cache', default=True, action='store_false',
+                      help=r'Skip the binary spline cache', dest='use_cache')
+    (options, args) = parser.parse_args(argv)
+
+    from genieutils.query import SplineQuery
+    from genieutils.reader import iter_spline_files
+
+    targets = options.targets if options.targets else ['1000060120']
+    if options.currents:
+        currents = [c.upper() for c in options.currents]
+    else:
+        currents = ['CC' if options.is_cc else 'NC']
+
+    flavors = [14, -14, 12, -12]
+
+    query = SplineQuery(flavors=flavors, targets=targets, currents=currents)
+
+    matching = []
+    for s in iter_spline_files(options.spline_files, query,
+                               options.use_cache, options.jobs):
+        print(s.description)
+        matching.append(s)
+
+    buckets = bucket_splines(matching)
+
+    for target in targets:
+        for current in currents:
+            for flavor in flavors:
+                total = sum_cross_section_dicts(
+                    buckets.get((flavor, current_code(current), int(target)),
+                                []))
+                write_sum_of_xsecs(total, flavor_name(flavor), current,
+                                   target, options.min_e, options.max_e)
@@ -0,0 +1,228 @@
+'''
+Score splines against the BEBC diffractive pion production data.
+Usage:
+    python -m genieutils score <-f>/<-flag> <arg>
+                           -s / --splines spline1,spline2,spline3,...
+                           -m / --models      : Only score these models
+                                                (algorithms)
+                                --nu-data     : The muon neutrino data
+                                                (./bebc_neutrino_data.csv)
+                                --anu-data    : The muon antineutrino data
+                                                (./bebc_antineutrino_data.csv)
+                           -k / --top         : Only list the best k variants
+                           -j / --jobs        : Parse the spline files in
+                                                this many processes
+                                --no-cache    : Don't read/write the binary
+                                                spline cache
+
+Every model variant (spline file, algorithm, configuration and target) with
+muon neutrino and/or antineutrino CC splines is scored: the splines of a
+variant are summed, averaged over each data bin (linearly between knots,
+zero outside them) and compared with the data by a chi-square with
+asymmetric errors (the error on the side of the model). All variants on
+the same knot grid are averaged and scored as one (variants x bins) array.
+The variants are listed by total chi-square, with the p-value for as many
+degrees of freedom as data bins.
+'''
+from __future__ import print_function
+from collections import OrderedDict, namedtuple
+import math
+import os
+
+from genieutils.cli import split_list
+from genieutils.units import cm2
+
+BebcData = namedtuple('BebcData', ['centers', 'xsecs', 'lows', 'highs',
+                                   'unc_lows', 'unc_highs'])
+
+NU_DATA = './bebc_neutrino_data.csv'
+ANU_DATA = './bebc_antineutrino_data.csv'
+
+
+def read_bebc_data(file_name):
+    """
+    Read a BEBC data file (bin center, xsec, bin low, bin high, and the
+    lower and upper ends of the error bar, all cross sections in cm2) into
+    a BebcData of arrays.
+    """
+    import numpy as np
+
+    table = np.atleast_2d(np.loadtxt(file_name, delimiter=',',
+                                     comments='#'))
+    return BebcData(*table.T.copy())
+
+
+def bin_averages(energies, xsecs, lows, highs):
+    """
+    The average over each [low, high] bin of a (splines x knots) stack of
+    splines sharing the knot `energies`, taken to be linear between knots
+    and zero outside them. Returns a (splines x bins) array.
+    """
+    import numpy as np
+    from genieutils.grids import resample_stack
+
+    xsecs = np.atleast_2d(xsecs)
+    if len(energies) < 2:
+        return np.zeros((len(xsecs), len(lows)))
+    segments = np.diff(energies) * (xsecs[:, 1:] + xsecs[:, :-1]) / 2.0
+    cumulative = np.concatenate((np.zeros((len(xsecs), 1)),
+                                 np.cumsum(segments, axis=1)), axis=1)
+
+    # integral from the first knot up to every bin edge at once
+    edges = np.clip(np.concatenate((lows, highs)), energies[0], energies[-1])
+    idx = np.clip(np.searchsorted(energies, edges, side='right') - 1, 0,
+                  len(energies) - 2)
+    integrals = cumulative[:, idx] + (edges - energies[idx]) * \
+        (xsecs[:, idx] + resample_stack(energies, xsecs, edges)) / 2.0
+    nbins = len(lows)
+    return (integrals[:, nbins:] - integrals[:, :nbins]) / (highs - lows)
+
+
+def chi_square(model, data):
+    """
+    Chi-square of (variants x bins) model bin averages against BebcData,
+    using the lower or upper error of each bin depending on which side of
+    the data point the model is. Returns one chi-square per variant.
+    """
+    import numpy as np
+
+    residuals = np.atleast_2d(model) - data.xsecs
+    errors = np.where(residuals > 0, data.unc_highs - data.xsecs,
+                      data.xsecs - data.unc_lows)
+    return ((residuals / errors) ** 2).sum(axis=1)
+
+
+def chi2_sf(chi2, dof):
+    """
+    Survival function (p-value) of the chi-square distribution with an
+    integer number of degrees of freedom, in closed form (finite series),
+    for an array of chi-square values.
+    """
+    import numpy as np
+
+    chi2 = np.asarray(chi2, dtype=np.float64)
+    if dof % 2 == 0:
+        term = np.ones_like(chi2)
+        total = np.ones_like(chi2)
+        for i in range(1, dof // 2):
+            term = term * chi2 / (2.0 * i)
+            total = total + term
+        return np.exp(-chi2 / 2.0) * total
+    erfc = np.vectorize(math.erfc, otypes=[np.float64])
+    term = np.sqrt(chi2)
+    total = np.zeros_like(chi2)
+    for i in range(1, (dof + 1) // 2):
+        total = total + term
+        term = term * chi2 / (2.0 * i + 1.0)
+    return erfc(np.sqrt(chi2 / 2.0)) + \
+        math.sqrt(2.0 / math.pi) * np.exp(-chi2 / 2.0) * total
+
+
+def score_variants(tables, data):
+    """
+    Chi-square of every (energies, xsecs in cm2) table in `tables` against
+    BebcData. Tables on the same knot grid are stacked and scored together.
+    """
+    import numpy as np
+    from genieutils.grids import grid_fingerprint
+
+    chi2 = np.zeros(len(tables))
+    grids = OrderedDict()
+    for i, (energies, xsecs) in enumerate(tables):
+        grids.setdefault(grid_fingerprint(energies), []).append(i)
+    for members in grids.values():
+        energies = tables[members[0]][0]
+        model = bin_averages(energies,
+                             np.vstack([tables[i][1] for i in members]),
+                             data.lows, data.highs)
+        chi2[members] = chi_square(model, data)
+    return chi2
+
+
+def variant_tables(splines):
+    """
+    Sum the splines of each variant (file, algorithm, configuration,
+    target), given as (file, Spline) pairs, into an (energies, xsecs in cm2)
+    table. Returns an OrderedDict of variant -> table.
+    """
+    from genieutils.grids import sum_splines
+
+    variants = OrderedDict()
+    for spline_file, spline in splines:
+        variants.setdefault((spline_file, spline.algorithm, spline.config,
+                             spline.tgt), []).append(spline)
+    return OrderedDict(
+        (variant, tuple(sum_splines([s.energies for s in members],
+                                    [s.xsecs / cm2 for s in members])))
+        for variant, members in variants.items())
+
+
+def main(argv=None):
+    from optparse import OptionParser
+
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('-s', '--splines', type='string', action='callback',
+                      callback=split_list, dest='spline_files', default=[])
+    parser.add_option('-m', '--models', type='string', action='callback',
+                      callback=split_list, dest='models', default=[])
+    parser.add_option('--nu-data', type='string', default=NU_DATA,
+                      help=r'The muon neutrino data', dest='nu_data')
+    parser.add_option('--anu-data', type='string', default=ANU_DATA,
+                      help=r'The muon antineutrino data', dest='anu_data')
+    parser.add_option('-k', '--top', type='int', default=None,
+                      help=r'Only list the best k variants', dest='top')
+    parser.add_option('-j', '--jobs', type='int', default=1,
+                      help=r'Number of parsing processes', dest='jobs')
+    parser.add_option('--no-cache', default=True, action='store_false',
+                      help=r'Skip the binary spline cache', dest='use_cache')
+    (options, args) = parser.parse_args(argv)
+    for data_file in (options.nu_data, options.anu_data):
+        if not os.path.isfile(data_file):
+            parser.error('no BEBC data file ' + data_file +
+                         ' (see --nu-data/--anu-data)')
+
+    import numpy as np
+    from genieutils.query import SplineQuery
+    from genieutils.reader import iter_spline_files
+
+    query = SplineQuery(
+        algorithms=None if not options.models or 'all' in options.models
+        else options.models, flavors=[14, -14], currents=['CC'])
+    splines = {14: [], -14: []}
+    for spline_file in options.spline_files:
+        for spline in iter_spline_files([spline_file], query,
+                                        options.use_cache, options.jobs):
+            splines[spline.nu].append((spline_file, spline))
+
+    # chi2 and number of bins per variant
+    scores = OrderedDict()
+    for nu, data_file in ((14, options.nu_data), (-14, options.anu_data)):
+        data = read_bebc_data(data_file)
+        tables = variant_tables(splines[nu])
+        chi2 = score_variants(list(tables.values()), data)
+        for variant, value in zip(tables, chi2):
+            score = scores.setdefault(variant, {})
+            score[nu] = value
+            score['dof'] = score.get('dof', 0) + len(data.xsecs)
+    if not scores:
+        parser.error('no muon neutrino or antineutrino CC splines found')
+
+    totals = np.array([score.get(14, 0.0) + score.get(-14, 0.0)
+                       for score in scores.values()])
+    dofs = np.array([score['dof'] for score in scores.values()])
+    p_values = np.zeros(len(totals))
+    for dof in set(dofs):
+        p_values[dofs == dof] = chi2_sf(totals[dofs == dof], dof)
+
+    order = np.argsort(totals, kind='mergesort')[:options.top]
+    print('{0:>10s} {1:>10s} {2:>10s} {3:>4s} {4:>10s}  {5}'.format(
+        'chi2(nu)', 'chi2(anu)', 'chi2', 'dof', 'p-value', 'variant'))
+    variants = list(scores)
+    for i in order:
+        spline_file, algorithm, config, tgt = variants[i]
+        score = scores[variants[i]]
+        print('{0:>10s} {1:>10s} {2:10.4f} {3:4d} {4:10.4g}  {5}'.format(
+            '%.4f' % score[14] if 14 in score else '-',
+            '%.4f' % score[-14] if -14 in score else '-',
+            totals[i], dofs[i], p_values[i],
+            '{0}:{1}/{2} on {3}'.format(spline_file, algorithm, config, tgt)))
@@ -0,0 +1,101 @@
+"""
+Content-hashed record of derived results, for incremental pipeline runs.
+
+Each result is stored in a json file under a key hashed from everything it
+was derived from (file contents, channel, energy range, ...), so a later
+run can reuse it as long as none of those inputs changed and only has to
+recompute the rest. File contents are hashed (sha1) once per size and mtime
+of the file, as for the spline cache. Only the results and files a run
+looked at are written back, so results of inputs that have since changed
+don't pile up.
+"""
+import hashlib
+import json
+import os
+
+
+BUILD_VERSION = 1
+BUILD_FILE = '.genieutils-build.json'
+
+
+class BuildState(object):
+    """
+    The results recorded in `path` (nothing if it doesn't exist yet, or was
+    written by another BUILD_VERSION). Call `save` to write back the results
+    looked up or added with `put` since then; the others are dropped.
+    """
+
+    def __init__(self, path=BUILD_FILE):
+        self.path = path
+        self.files = {}
+        self.results = {}
+        self.used_files = set()
+        self.used_keys = set()
+        try:
+            with open(path, 'r') as f:
+                state = json.load(f)
+        except (IOError, OSError, ValueError):
+            return
+        if state.get('version') == BUILD_VERSION:
+            self.files = state['files']
+            self.results = state['results']
+
+    def file_digest(self, file_name):
+        """
+        sha1 of the contents of `file_name`, re-hashed only if its size or
+        mtime changed since it was last hashed.
+        """
+        from genieutils.cache import file_hash, file_signature
+
+        file_name = os.path.abspath(file_name)
+        self.used_files.add(file_name)
+        signature = file_signature(file_name)
+        known = self.files.get(file_name)
+        if known is None or known['size'] != signature['size'] or \
+                known['mtime'] != signature['mtime']:
+            signature['sha1'] = file_hash(file_name)
+            self.files[file_name] = known = signature
+        return known['sha1']
+
+    def key(self, *inputs):
+        """
+        Key for a result derived from `inputs` (anything json can encode;
+        use `file_digest` for file contents).
+        """
+        text = json.dumps([BUILD_VERSION] + list(inputs), sort_keys=True)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def __contains__(self, key):
+        self.used_keys.add(key)
+        return key in self.results
+
+    def get(self, key, default=None):
+        self.used_keys.add(key)
+        return self.results.get(key, default)
+
+    def put(self, key, value):
+        self.used_keys.add(key)
+        self.results[key] = value
+
+    def save(self):
+        """
+        Write the results and file digests used by this run back to `path`
+        (via a temporary file, so a crash never leaves a truncated state
+        behind).
+        """
+        files = dict((file_name, signature)
+                     for file_name, signature in self.files.items()
+                     if file_name in self.used_files)
+        results = dict((key, value) for key, value in self.results.items()
+                       if key in self.used_keys)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': BUILD_VERSION, 'files': files,
+                       'results': results}, f)
+        try:
+            os.replace(tmp_path, self.path)
+        except AttributeError:
+            # python 2: rename won't overwrite on every platform
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(tmp_path, self.path)
@@ -0,0 +1,193 @@
+"""
+Binary cache for parsed GENIE spline files.
+
+The first time a spline xml file is read, the knots of every spline are
+written as flat float64 arrays (plus an int64 array of per-spline offsets)
+into a `<xml file>.cache` directory next to the xml file, together with a
+json table of the spline names and their decoded fields (one column per
+genieutils.spline.FIELDS). Later reads memory-map the arrays and rebuild
+the Spline records from the table instead of parsing the xml, or even the
+names, again; a query can pick its rows from the columns before any Spline
+is built (see genieutils.query).
+
+The cache remembers the size, mtime and sha1 of the xml it was built from.
+If the size changes the cache is rebuilt; if only the mtime changes the
+file is re-hashed and the cache is rebuilt only if the content changed.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from genieutils.spline import FIELDS, Spline
+
+CACHE_VERSION = 4
+ENERGIES_FILE = 'energies.f64'
+XSECS_FILE = 'xsecs.f64'
+OFFSETS_FILE = 'offsets.i64'
+META_FILE = 'meta.json'
+
+
+def cache_path(xml_file_name):
+    """
+    Directory holding the cache for `xml_file_name`.
+    """
+    return xml_file_name + '.cache'
+
+
+def file_hash(file_name, block_size=1 << 20):
+    """
+    sha1 hex digest of the contents of a file, read in blocks.
+    """
+    sha = hashlib.sha1()
+    with open(file_name, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def file_signature(file_name):
+    """
+    The cheap part of a file's identity: size and modification time.
+    """
+    st = os.stat(file_name)
+    return {'size': st.st_size, 'mtime': st.st_mtime}
+
+
+def read_meta(xml_file_name):
+    """
+    Return the cache metadata for `xml_file_name` if a cache exists and is
+    still valid for the file, otherwise None.
+    """
+    meta_file = os.path.join(cache_path(xml_file_name), META_FILE)
+    try:
+        with open(meta_file, 'r') as f:
+            meta = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    if meta.get('version') != CACHE_VERSION:
+        return None
+
+    source = meta['source']
+    current = file_signature(xml_file_name)
+    if source['size'] != current['size']:
+        return None
+    if source['mtime'] != current['mtime']:
+        # touched, but not necessarily changed - let the content decide
+        if file_hash(xml_file_name) != source['sha1']:
+            return None
+        source['mtime'] = current['mtime']
+        try:
+            with open(meta_file, 'w') as f:
+                json.dump(meta, f)
+        except (IOError, OSError):
+            pass
+    return meta
+
+
+def _map_array(file_name, dtype, count):
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(file_name, dtype=dtype, mode='r', shape=(count,))
+
+
+def iter_cache_rows(xml_file_name, meta, rows=None):
+    """
+    Iterate over the Splines of a valid cache (`meta` as returned by
+    `read_meta`), or only over its `rows` (spline indices) if given. Only the
+    knots of those splines are touched.
+    """
+    directory = cache_path(xml_file_name)
+    nknots = meta['nknots']
+    offsets = np.fromfile(os.path.join(directory, OFFSETS_FILE),
+                          dtype=np.int64)
+    energies = _map_array(os.path.join(directory, ENERGIES_FILE),
+                          np.float64, nknots)
+    xsecs = _map_array(os.path.join(directory, XSECS_FILE),
+                       np.float64, nknots)
+    names = meta['splines']
+    columns = [meta['columns'][field] for field in FIELDS]
+    if rows is None:
+        rows = range(len(names))
+    for i in rows:
+        start, stop = offsets[i], offsets[i + 1]
+        yield Spline.from_fields(names[i], [column[i] for column in columns],
+                                 energies[start:stop], xsecs[start:stop])
+
+
+def _iter_and_build(xml_file_name, reader):
+    # only needed when (re)building, so kept off the startup path
+    import shutil
+    import tempfile
+
+    directory = cache_path(xml_file_name)
+    parent = os.path.dirname(os.path.abspath(directory))
+    try:
+        tmp_dir = tempfile.mkdtemp(prefix='.spline-cache-', dir=parent)
+    except (IOError, OSError):
+        # can't write next to the xml file - just don't cache
+        for spline in reader(xml_file_name):
+            yield spline
+        return
+
+    # mkdtemp creates the directory private to us; give it normal permissions
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(tmp_dir, 0o777 & ~umask)
+
+    source = file_signature(xml_file_name)
+    source['sha1'] = file_hash(xml_file_name)
+    complete = False
+    try:
+        names = []
+        columns = dict((field, []) for field in FIELDS)
+        offsets = [0]
+        with open(os.path.join(tmp_dir, ENERGIES_FILE), 'wb') as ef, \
+                open(os.path.join(tmp_dir, XSECS_FILE), 'wb') as xf:
+            for spline in reader(xml_file_name):
+                np.asarray(spline.energies, dtype=np.float64).tofile(ef)
+                np.asarray(spline.xsecs, dtype=np.float64).tofile(xf)
+                offsets.append(offsets[-1] + len(spline.energies))
+                names.append(spline.name)
+                for field, value in zip(FIELDS, spline.fields):
+                    columns[field].append(value)
+                yield spline
+
+        np.array(offsets, dtype=np.int64).tofile(
+            os.path.join(tmp_dir, OFFSETS_FILE))
+        meta = {'version': CACHE_VERSION, 'source': source,
+                'nknots': offsets[-1], 'splines': names,
+                'columns': columns}
+        with open(os.path.join(tmp_dir, META_FILE), 'w') as f:
+            json.dump(meta, f)
+
+        # another process may have built the cache meanwhile: keep whichever
+        # valid cache landed first and only ever delete our own tmp dir
+        if read_meta(xml_file_name) is not None:
+            return
+        if os.path.isdir(directory):
+            shutil.rmtree(directory, ignore_errors=True)
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            return
+        complete = True
+    finally:
+        if not complete:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def iter_cached_splines(xml_file_name, reader, use_cache=True):
+    """
+    Iterate over the Splines of `xml_file_name`. If a valid cache exists
+    the Splines come from the memory-mapped cache, otherwise they come from
+    `reader(xml_file_name)` and a new cache is written as they go by (and
+    only kept if the iteration completes).
+    """
+    if not use_cache:
+        return reader(xml_file_name)
+    meta = read_meta(xml_file_name)
+    if meta is not None:
+        return iter_cache_rows(xml_file_name, meta)
+    return _iter_and_build(xml_file_name, reader)
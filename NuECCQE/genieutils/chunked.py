@@ -0,0 +1,129 @@
+"""
+Chunk-parallel parsing of a single spline xml file.
+
+The byte-offset index splits the file at <spline> boundaries and records
+the knot count of every spline, so the parent process can lay out the knot
+arrays of the whole file up front in one shared memory block. The splines
+are then divided into chunks of roughly equal byte size which worker
+processes parse straight into their slots of that block; only the chunk
+descriptions go through pickling, never the knots.
+"""
+import re
+
+import numpy as np
+
+from genieutils.index import load_index
+from genieutils.parallel import map_in_order
+from genieutils.spline import Spline
+
+_knot = re.compile(br'<E>([^<]*)</E>\s*<xsec>([^<]*)</xsec>')
+_knot_tag = b'<knot>'
+
+
+def _fill_knots(xml_file_name, knots, blocks):
+    """
+    Parse the spline blocks (offset, length, first knot, number of knots) of
+    `xml_file_name` into the (2 x total knots) array `knots`.
+    """
+    with open(xml_file_name, 'rb') as f:
+        for offset, length, start, nknots in blocks:
+            f.seek(offset)
+            pairs = _knot.findall(f.read(length))
+            if len(pairs) != nknots:
+                raise ValueError(
+                    'Expected {0} knots at byte {1} of {2}, found {3}'.format(
+                        nknots, offset, xml_file_name, len(pairs)))
+            if nknots:
+                values = np.array(pairs, dtype=np.float64)
+                knots[:, start:start + nknots] = values.T
+
+
+def _parse_chunk(task):
+    from multiprocessing.shared_memory import SharedMemory
+
+    xml_file_name, shm_name, total, blocks = task
+    shm = SharedMemory(name=shm_name)
+    try:
+        knots = np.ndarray((2, total), dtype=np.float64, buffer=shm.buf)
+        _fill_knots(xml_file_name, knots, blocks)
+        del knots
+    finally:
+        shm.close()
+    return len(blocks)
+
+
+def _chunks(blocks, nchunks):
+    """
+    Split `blocks` into at most `nchunks` runs of roughly equal byte size.
+    """
+    total = float(sum(b[1] for b in blocks))
+    chunks = [[]]
+    done = 0
+    for block in blocks:
+        if chunks[-1] and done >= total * len(chunks) / nchunks:
+            chunks.append([])
+        chunks[-1].append(block)
+        done += block[1]
+    return chunks
+
+
+def read_spline_knots(xml_file_name, entries=None, jobs=1):
+    """
+    Parse the knots of `entries` (index entries, default every spline in the
+    file) of one spline file, using `jobs` worker processes. Returns a list of
+    (name, energies, xsecs) in file order.
+    """
+    _, all_entries = load_index(xml_file_name)
+    if entries is None:
+        entries = all_entries
+    entries = sorted(entries, key=lambda e: e.offset)
+
+    counts = []
+    with open(xml_file_name, 'rb') as f:
+        for entry in entries:
+            if entry.nknots >= 0:
+                counts.append(entry.nknots)
+            else:
+                f.seek(entry.offset)
+                counts.append(f.read(entry.length).count(_knot_tag))
+    starts = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+    total = int(starts[-1])
+    blocks = [(e.offset, e.length, int(start), n)
+              for e, start, n in zip(entries, starts, counts)]
+
+    shm = None
+    if jobs > 1 and len(blocks) > 1:
+        try:
+            from multiprocessing.shared_memory import SharedMemory
+        except ImportError:
+            jobs = 1
+        else:
+            shm = SharedMemory(create=True, size=max(2 * total * 8, 1))
+
+    if shm is None:
+        knots = np.empty((2, total), dtype=np.float64)
+        _fill_knots(xml_file_name, knots, blocks)
+    else:
+        try:
+            tasks = [(xml_file_name, shm.name, total, chunk)
+                     for chunk in _chunks(blocks, 4 * jobs)]
+            map_in_order(_parse_chunk, tasks, jobs)
+            shared = np.ndarray((2, total), dtype=np.float64, buffer=shm.buf)
+            knots = shared.copy()
+            del shared
+        finally:
+            shm.close()
+            shm.unlink()
+
+    return [(e.name, knots[0, start:start + n], knots[1, start:start + n])
+            for e, (_, _, start, n) in zip(entries, blocks)]
+
+
+def iter_chunked_splines(xml_file_name, entries=None, jobs=1):
+    """
+    Chunk-parallel counterpart of streaming a spline file: yield a Spline
+    for each spline parsed by `read_spline_knots`.
+    """
+    splines = read_spline_knots(xml_file_name, entries, jobs)
+    for name, energies, xsecs in splines:
+        yield Spline(name, energies, xsecs)
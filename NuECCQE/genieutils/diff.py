@@ -0,0 +1,193 @@
+'''
+Compare the splines of two GENIE spline files (e.g. two GENIE releases).
+Usage:
+    python -m genieutils diff <old file> <new file> <-f>/<-flag> <arg>
+                           -t / --threshold   : Relative difference to report
+                                                (default 0.01)
+                           -m / --models      : Only compare these models
+                                                (algorithms)
+                           -n / --min         : Min energy compared
+                           -x / --max         : Max energy compared
+                           -a / --all         : List every matched spline
+                                --match-config: Also match the algorithm
+                                                configuration
+                           -j / --jobs        : Parse the spline files in
+                                                this many processes
+                                --no-cache    : Don't read/write the binary
+                                                spline cache
+
+Splines are matched by their description: the algorithm and everything the
+name says about the interaction (flavor, target, nucleon, process, ...) but
+not, unless --match-config is given, the algorithm configuration, which
+tends to be renamed between releases. (Descriptions several splines of the
+old file share are told apart by configuration as well.) Each matched pair
+is resampled onto the union of both knot grids (linearly, zero outside the
+knots) and compared by the relative difference
+|new - old| / max(|old|, |new|), so thresholds that moved count as 100%.
+Pairs are compared in batches, one array operation per pair of knot grids,
+while the new file is streamed.
+
+The splines differing by more than the threshold anywhere are listed with
+their maximum and mean relative difference, followed by the splines found
+in only one of the files. The exit status is 1 if any were listed, 0 if the
+files agree.
+'''
+from __future__ import print_function
+from collections import Counter, OrderedDict
+
+from genieutils.cli import split_list
+
+BATCH_SIZE = 4096
+
+
+def description_key(spline, match_config=False):
+    """
+    The key splines are matched by: the spline name without the algorithm
+    configuration (e.g. 'ReinDFRPXSec/nu:-12;tgt:1000010010;N:2212;...').
+    """
+    first, sep, rest = spline.name.partition(';')
+    config = spline.config + '/' if match_config and spline.config else ''
+    return spline.algorithm + '/' + config + first.split('/')[-1] + sep + rest
+
+
+def compare_splines(pairs, emin=None, emax=None):
+    """
+    Maximum and mean relative difference of each (old, new) pair of Splines,
+    over the union of their knots (within [emin, emax] if given) where
+    either is non-zero. Pairs on the same two knot grids are resampled and
+    compared as one (pairs x knots) array.
+    """
+    import numpy as np
+    from genieutils.grids import common_grid, resample_stack, spline_grid
+
+    max_diff = np.zeros(len(pairs))
+    mean_diff = np.zeros(len(pairs))
+    grids = OrderedDict()
+    for i, (old, new) in enumerate(pairs):
+        grids.setdefault((spline_grid(old), spline_grid(new)), []).append(i)
+
+    for members in grids.values():
+        old_energies = pairs[members[0]][0].energies
+        new_energies = pairs[members[0]][1].energies
+        grid = common_grid([old_energies, new_energies])
+        if emin is not None:
+            grid = grid[grid >= emin]
+        if emax is not None:
+            grid = grid[grid <= emax]
+        if len(grid) == 0:
+            continue
+        old = resample_stack(old_energies,
+                             np.vstack([pairs[i][0].xsecs for i in members]),
+                             grid)
+        new = resample_stack(new_energies,
+                             np.vstack([pairs[i][1].xsecs for i in members]),
+                             grid)
+        scale = np.maximum(np.abs(old), np.abs(new))
+        diff = np.abs(new - old) / np.where(scale > 0, scale, 1.0)
+        max_diff[members] = diff.max(axis=1)
+        mean_diff[members] = diff.sum(axis=1) / \
+            np.maximum((scale > 0).sum(axis=1), 1)
+    return max_diff, mean_diff
+
+
+def diff_spline_files(old_file, new_file, query=None, emin=None, emax=None,
+                      match_config=False, use_cache=True, jobs=1):
+    """
+    Compare two spline files. The old file is read into memory, the new one
+    streamed and compared in batches of BATCH_SIZE matched pairs, so only
+    the summaries of the compared pairs are kept.
+
+    Returns (differences, only_old, only_new): a list of
+    (key, max relative difference, mean relative difference) for every
+    matched pair, and the keys of the splines only in either file.
+    """
+    from genieutils.reader import iter_spline_files
+
+    old_list = list(iter_spline_files([old_file], query, use_cache, jobs))
+    keys = [description_key(spline, match_config) for spline in old_list]
+    ambiguous = set(key for key, count in Counter(keys).items() if count > 1)
+    old_splines = OrderedDict(
+        (description_key(spline, True) if key in ambiguous else key, spline)
+        for key, spline in zip(keys, old_list))
+    del old_list
+
+    differences = []
+    only_new = []
+    batch = []
+
+    def flush():
+        max_diff, mean_diff = compare_splines([pair for _, pair in batch],
+                                              emin, emax)
+        differences.extend(zip([key for key, _ in batch], max_diff,
+                               mean_diff))
+        del batch[:]
+
+    for spline in iter_spline_files([new_file], query, use_cache, jobs):
+        key = description_key(spline, match_config)
+        if key in ambiguous:
+            key = description_key(spline, True)
+        old = old_splines.pop(key, None)
+        if old is None:
+            only_new.append(key)
+            continue
+        batch.append((key, (old, spline)))
+        if len(batch) >= BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+    return differences, list(old_splines), only_new
+
+
+def main(argv=None):
+    from optparse import OptionParser
+
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('-t', '--threshold', type='float', default=0.01,
+                      help=r'Relative difference to report',
+                      dest='threshold')
+    parser.add_option('-m', '--models', type='string', action='callback',
+                      callback=split_list, dest='models', default=[])
+    parser.add_option('-n', '--min', type='float', default=None,
+                      help=r'Minimum energy', dest='min_e')
+    parser.add_option('-x', '--max', type='float', default=None,
+                      help=r'Maximum energy', dest='max_e')
+    parser.add_option('-a', '--all', default=False, action='store_true',
+                      help=r'List every matched spline', dest='all')
+    parser.add_option('--match-config', default=False, action='store_true',
+                      help=r'Also match the algorithm configuration',
+                      dest='match_config')
+    parser.add_option('-j', '--jobs', type='int', default=1,
+                      help=r'Number of parsing processes', dest='jobs')
+    parser.add_option('--no-cache', default=True, action='store_false',
+                      help=r'Skip the binary spline cache', dest='use_cache')
+    (options, args) = parser.parse_args(argv)
+    if len(args) != 2:
+        parser.error('diff needs an old and a new spline file')
+    old_file, new_file = args
+
+    from genieutils.reader import models_query
+
+    differences, only_old, only_new = diff_spline_files(
+        old_file, new_file, models_query(options.models), options.min_e,
+        options.max_e, options.match_config, options.use_cache, options.jobs)
+
+    listed = [d for d in differences
+              if options.all or d[1] > options.threshold]
+    listed.sort(key=lambda d: -d[1])
+    print('Matched {0} splines, {1} differ by more than {2:g}%'.format(
+        len(differences), sum(1 for d in differences
+                              if d[1] > options.threshold),
+        100 * options.threshold))
+    if listed:
+        print('{0:>10s} {1:>10s}  {2}'.format('max', 'mean', 'spline'))
+        for key, max_diff, mean_diff in listed:
+            print('{0:9.3f}% {1:9.3f}%  {2}'.format(
+                100 * max_diff, 100 * mean_diff, key))
+    for file_name, keys in ((old_file, only_old), (new_file, only_new)):
+        if keys:
+            print('\n{0} splines only in {1}:'.format(len(keys), file_name))
+            for key in keys:
+                print('  ' + key)
+
+    moved = any(d[1] > options.threshold for d in differences)
+    return 1 if moved or only_old or only_new else 0
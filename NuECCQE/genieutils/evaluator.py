@@ -0,0 +1,140 @@
+"""
+Evaluation of GENIE splines between their knots.
+
+GENIE stores cross sections as knots (spaced logarithmically in energy when
+the spline file says `uselog="1"`) and evaluates them with a ROOT TSpline3
+cubic spline. SplineEvaluator precomputes the per-segment polynomial
+coefficients once, so evaluating at any number of energies is a binary
+search and a Horner step over numpy arrays.
+"""
+import numpy as np
+
+KINDS = ('linear', 'loglinear', 'cubic')
+
+
+def _solve_tridiagonal(lower, diag, upper, rhs):
+    """
+    Solve a tridiagonal system in O(n) (Thomas algorithm). Row i reads
+    lower[i] x[i-1] + diag[i] x[i] + upper[i] x[i+1] = rhs[i] (lower[0] and
+    upper[-1] are unused); `rhs` may have extra trailing dimensions for
+    several right hand sides.
+    """
+    n = len(diag)
+    diag = np.array(diag, dtype=np.float64)
+    rhs = np.array(rhs, dtype=np.float64)
+    for i in range(1, n):
+        w = lower[i] / diag[i - 1]
+        diag[i] -= w * upper[i - 1]
+        rhs[i] -= w * rhs[i - 1]
+    x = np.empty_like(rhs)
+    x[-1] = rhs[-1] / diag[-1]
+    for i in range(n - 2, -1, -1):
+        x[i] = (rhs[i] - upper[i] * x[i + 1]) / diag[i]
+    return x
+
+
+def _second_derivatives(h, d):
+    """
+    Knot second derivatives of the cubic spline with not-a-knot end
+    conditions (TSpline3's behaviour when no end conditions are given).
+    `h` are the knot spacings, `d` the (n-1, ...) segment slopes.
+    """
+    n = len(h) + 1
+    shape = (n,) + d.shape[1:]
+    if n < 3:
+        return np.zeros(shape)
+    if n == 3:
+        # not-a-knot on three knots is the parabola through them
+        return np.broadcast_to(2.0 * (d[1] - d[0]) / (h[0] + h[1]),
+                               shape).copy()
+
+    # the interior rows are tridiagonal; the not-a-knot conditions
+    #   m[0] = ((h[0] + h[1]) m[1] - h[0] m[2]) / h[1]
+    #   m[-1] = ((h[-2] + h[-1]) m[-2] - h[-1] m[-3]) / h[-2]
+    # are folded into the first and last of them, which keeps it that way
+    lower = h[:-1].copy()
+    diag = 2.0 * (h[:-1] + h[1:])
+    upper = h[1:].copy()
+    rhs = 6.0 * (d[1:] - d[:-1])
+    diag[0] += h[0] * (h[0] + h[1]) / h[1]
+    upper[0] -= h[0] * h[0] / h[1]
+    diag[-1] += h[-1] * (h[-2] + h[-1]) / h[-2]
+    lower[-1] -= h[-1] * h[-1] / h[-2]
+    inner = _solve_tridiagonal(lower, diag, upper, rhs)
+
+    m = np.empty(shape)
+    m[1:-1] = inner
+    m[0] = ((h[0] + h[1]) * inner[0] - h[0] * inner[1]) / h[1]
+    m[-1] = ((h[-2] + h[-1]) * inner[-1] - h[-1] * inner[-2]) / h[-2]
+    return m
+
+
+class SplineEvaluator(object):
+    """
+    Evaluate a spline given by its knot `energies` and `xsecs`. `xsecs` may
+    also be a (channels x knots) array of several splines on the same knots,
+    in which case evaluating returns a (channels x points) array.
+
+    kind is one of:
+    - 'linear': linear interpolation in energy,
+    - 'loglinear': linear interpolation in log(energy), which follows the
+      `uselog` knot spacing,
+    - 'cubic' (default): the cubic spline GENIE gets from TSpline3, with
+      GENIE's guards: segments touching a zero knot are interpolated
+      linearly (so threshold regions do not ring) and negative values are
+      set to zero.
+
+    In every case the spline is zero outside of its knot range.
+    """
+
+    def __init__(self, energies, xsecs, kind='cubic'):
+        if kind not in KINDS:
+            raise ValueError('Unknown spline kind: ' + str(kind))
+        self.kind = kind
+        self.knots = np.asarray(energies, dtype=np.float64)
+        y = np.asarray(xsecs, dtype=np.float64).T
+        x = np.log(self.knots) if kind == 'loglinear' else self.knots
+
+        n = len(x)
+        if n < 2:
+            # a lone knot: the spline is its value at that energy only
+            x = np.concatenate((x, x + 1.0))
+            y = np.concatenate((y, y))
+        h = np.diff(x)
+        shape = (-1,) + (1,) * (y.ndim - 1)
+        d = np.diff(y, axis=0) / h.reshape(shape)
+
+        c0 = y[:-1]
+        c1 = d
+        c2 = np.zeros_like(d)
+        c3 = np.zeros_like(d)
+        if kind == 'cubic':
+            m = _second_derivatives(h, d)
+            hh = h.reshape(shape)
+            cubic_c1 = d - hh * (2.0 * m[:-1] + m[1:]) / 6.0
+            cubic_c2 = m[:-1] / 2.0
+            cubic_c3 = (m[1:] - m[:-1]) / (6.0 * hh)
+            cubic = (y[:-1] != 0.0) & (y[1:] != 0.0)
+            c1 = np.where(cubic, cubic_c1, c1)
+            c2 = np.where(cubic, cubic_c2, c2)
+            c3 = np.where(cubic, cubic_c3, c3)
+
+        self._x = x
+        self._coeffs = (c0.T, c1.T, c2.T, c3.T)
+
+    def __call__(self, energies):
+        energies = np.asarray(energies, dtype=np.float64)
+        inside = (energies >= self.knots[0]) & (energies <= self.knots[-1])
+        if self.kind == 'loglinear':
+            u = np.log(np.where(inside, energies, self.knots[0]))
+        else:
+            u = energies
+        idx = np.clip(np.searchsorted(self._x, u, side='right') - 1,
+                      0, len(self._x) - 2)
+        dx = u - self._x[idx]
+        c0, c1, c2, c3 = [c[..., idx] for c in self._coeffs]
+        y = c0 + dx * (c1 + dx * (c2 + dx * c3))
+        y = np.where(inside, y, 0.0)
+        if self.kind == 'cubic':
+            y = np.maximum(y, 0.0)
+        return y
@@ -0,0 +1,32 @@
+"""
+Opening (possibly compressed) spline files.
+"""
+import os
+
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz')
+
+
+def is_compressed(file_name):
+    """
+    True if `file_name` is a gzip, bzip2 or xz file (judged by its suffix).
+    """
+    return os.path.splitext(file_name)[1].lower() in COMPRESSED_SUFFIXES
+
+
+def open_spline_file(file_name):
+    """
+    Open a spline file for binary reading. `.gz`, `.bz2` and `.xz` files are
+    decompressed on the fly as they are read, so they never need to be
+    unpacked to disk.
+    """
+    suffix = os.path.splitext(file_name)[1].lower()
+    if suffix == '.gz':
+        import gzip
+        return gzip.open(file_name, 'rb')
+    if suffix == '.bz2':
+        import bz2
+        return bz2.BZ2File(file_name, 'rb')
+    if suffix == '.xz':
+        import lzma
+        return lzma.open(file_name, 'rb')
+    return open(file_name, 'rb')
@@ -0,0 +1,185 @@
+"""
+Flux histogram loading.
+
+Fluxes come either as `TH1.Print("all")` text dumps or straight from the
+ROOT files they were dumped from. Either way they are returned as a
+FluxHistogram of arrays over all the bins TH1.Print lists, i.e. including
+the underflow and overflow bins (given the width of their neighbours),
+along with the `Total sum=` (sum of weights) TH1.Print reports.
+
+Reading ROOT files needs uproot (pure Python, `pip install uproot`), which
+is only imported when a ROOT file is actually read.
+"""
+from collections import namedtuple
+import re
+
+
+DEFAULT_HISTOGRAM = 'flux_E_cvweighted'
+
+FluxHistogram = namedtuple('FluxHistogram',
+                           ['centers', 'edges', 'contents', 'errors',
+                            'total'])
+
+_flux_line = re.compile(r'fSumw\[\d+\]\s*=\s*([^,\s]+)\s*,'
+                        r'\s*x\s*=\s*([^,\s]+)\s*,'
+                        r'\s*error\s*=\s*([^,\s]+)')
+_total_sum = re.compile(r'Total sum\s*=\s*([^,\s]+)')
+
+
+def is_root_file(flux_file):
+    """
+    True for `file.root` and `file.root:histogram` flux specifications.
+    """
+    return split_root_path(flux_file)[0].lower().endswith('.root')
+
+
+def split_root_path(flux_file):
+    """
+    Split a `file.root:histogram` specification into (file, histogram);
+    the histogram defaults to DEFAULT_HISTOGRAM.
+    """
+    path, sep, histogram = flux_file.rpartition(':')
+    if sep and path.lower().endswith('.root') and '/' not in histogram:
+        return path, histogram
+    return flux_file, DEFAULT_HISTOGRAM
+
+
+def edges_from_centers(centers):
+    """
+    Bin edges half way between bin centers, with the outer edges half a
+    neighbouring bin out. Exact for uniform binning, which is all a text
+    dump can tell apart.
+    """
+    import numpy as np
+
+    centers = np.asarray(centers, dtype=np.float64)
+    if len(centers) == 0:
+        return np.zeros(0)
+    if len(centers) == 1:
+        return centers + np.array([-0.5, 0.5])
+    middle = (centers[:-1] + centers[1:]) / 2.0
+    return np.concatenate(([2 * centers[0] - middle[0]], middle,
+                           [2 * centers[-1] - middle[-1]]))
+
+
+def parse_flux_text(text):
+    """
+    Parse the text of a `TH1.Print("all")` dump into a FluxHistogram.
+
+    The bin lines (` fSumw[i]=content, x=center, error=error`) are turned
+    into one whitespace separated block of numbers and converted in a single
+    call; anything that doesn't fit that layout falls back to a regex scan.
+    Without a `Total sum=` header the total is the sum of the contents
+    between the underflow and overflow bins, as TH1 computes it.
+    """
+    import numpy as np
+
+    lines = [line for line in text.splitlines()
+             if line.lstrip().startswith('fSumw[')]
+    block = ' '.join(lines).replace('fSumw[', ' ').replace(']=', ' ') \
+        .replace(', x=', ' ').replace(', error=', ' ')
+    try:
+        table = np.array(block.split(), dtype=np.float64).reshape(-1, 4)
+        table = table[:, 1:]
+    except ValueError:
+        table = np.array(_flux_line.findall(text),
+                         dtype=np.float64).reshape(-1, 3)
+    centers = table[:, 1].copy()
+    contents = table[:, 0].copy()
+    total = _total_sum.search(text)
+    total = float(total.group(1)) if total else float(contents[1:-1].sum())
+    return FluxHistogram(centers, edges_from_centers(centers), contents,
+                         table[:, 2].copy(), total)
+
+
+def read_flux_text(flux_file):
+    """
+    Read a `TH1.Print("all")` dump into a FluxHistogram.
+    """
+    with open(flux_file, 'r') as fx:
+        return parse_flux_text(fx.read())
+
+
+def read_flux_root(flux_file):
+    """
+    Read a TH1 from a ROOT file (`file.root`, or `file.root:histogram` for
+    another histogram than DEFAULT_HISTOGRAM) into a FluxHistogram.
+    """
+    import numpy as np
+
+    try:
+        import uproot
+    except ImportError:
+        raise ImportError('Reading fluxes from ROOT files needs uproot '
+                          '(pip install uproot)')
+    path, histogram = split_root_path(flux_file)
+    with uproot.open(path) as root_file:
+        hist = root_file[histogram]
+        inner = np.asarray(hist.axis().edges(), dtype=np.float64)
+        contents = np.asarray(hist.values(flow=True), dtype=np.float64)
+        errors = np.asarray(hist.errors(flow=True), dtype=np.float64)
+    edges = np.concatenate(([2 * inner[0] - inner[1]], inner,
+                            [2 * inner[-1] - inner[-2]]))
+    centers = (edges[:-1] + edges[1:]) / 2.0
+    return FluxHistogram(centers, edges, contents, errors,
+                         float(contents[1:-1].sum()))
+
+
+def read_flux_histogram(flux_file):
+    """
+    Read a flux from a ROOT file or a text dump, by the file extension.
+    """
+    if is_root_file(flux_file):
+        return read_flux_root(flux_file)
+    return read_flux_text(flux_file)
+
+
+def absolute_contents(histogram, precision=1e-4):
+    """
+    The bin contents of a FluxHistogram, scaled to its `Total sum=` if they
+    don't add up to it (within the `precision` that total is printed with),
+    i.e. if the contents were rescaled after the histogram was filled.
+    """
+    inner = histogram.contents[1:-1].sum()
+    if inner <= 0 or abs(inner - histogram.total) <= \
+            precision * abs(histogram.total):
+        return histogram.contents
+    return histogram.contents * (histogram.total / inner)
+
+
+TOY_METHODS = ('gaussian', 'poisson')
+
+
+def flux_toys(histogram, ntoys, method='gaussian', seed=None):
+    """
+    Draw `ntoys` fluctuations of a FluxHistogram within its bin errors, as
+    one (ntoys x bins) array.
+
+    'gaussian' adds error x N(0, 1) to each bin (clipped at zero).
+    'poisson' treats each bin as (content / error)^2 effective entries,
+    draws a Poisson count for it and scales back, so low-statistics bins
+    fluctuate asymmetrically and never go negative. Bins without an error
+    are left as they are.
+    """
+    import numpy as np
+
+    if method not in TOY_METHODS:
+        raise ValueError('Unknown toy method: ' + str(method))
+    rng = np.random.RandomState(seed)
+    contents = histogram.contents
+    errors = histogram.errors
+    if method == 'gaussian':
+        toys = contents + errors * rng.standard_normal((ntoys, len(contents)))
+        return np.maximum(toys, 0.0)
+
+    fluctuating = (errors > 0) & (contents > 0)
+    entries = np.where(fluctuating, (contents / np.where(errors > 0, errors,
+                                                         1.0)) ** 2, 0.0)
+    scale = np.where(fluctuating, contents / np.where(entries > 0, entries,
+                                                      1.0), 0.0)
+    toys = np.empty((ntoys, len(contents)))
+    toys[:] = contents
+    toys[:, fluctuating] = rng.poisson(entries[fluctuating],
+                                       (ntoys, fluctuating.sum())) * \
+        scale[fluctuating]
+    return toys
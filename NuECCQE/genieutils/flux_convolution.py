@@ -0,0 +1,581 @@
+"""
+Flux convolution
+Usage:
+    python -m genieutils convolve <-f>/<-flag> <arg>
+    (or python flux_convolution.py <-f>/<-flag> <arg>)
+
+Convolve the summed cross sections written by `sum` and `print` with the
+MINERvA flux histograms in the current directory, or with the ones given
+with --fluxes (text dumps or ROOT files).
+
+With --toys N every flux is also fluctuated N times within its bin errors
+(gaussian, or poisson in the effective entries of each bin) and each
+channel is reported with the mean, rms and percentiles of its flux-averaged
+cross section over the toys.
+"""
+from __future__ import print_function
+from collections import OrderedDict, namedtuple
+from optparse import OptionValueError
+import os
+import re
+
+from genieutils.flux import (TOY_METHODS, flux_toys, read_flux_histogram,
+                             split_root_path)
+
+_xsec_line = re.compile(r'^\s*([^:\s]+)\s*:\s*([^x\s]+)', re.MULTILINE)
+
+
+def read_xsec_table(xsec_file):
+    """
+    Read a `E:  xsec x 10^(-38) cm2` table (as written by add_cross_sections.py
+    and print_splines.py) into arrays of energies and cross sections.
+    """
+    import numpy as np
+
+    with open(xsec_file, "r") as xs:
+        rows = _xsec_line.findall(xs.read())
+    table = np.array(rows, dtype=np.float64).reshape(-1, 2)
+    return table[:, 0], table[:, 1]
+
+
+def read_flux(flux_file):
+    """
+    Read a `TH1.Print("all")` dump (or a histogram in a ROOT file, see
+    genieutils.flux) into arrays of bin x values and contents.
+    """
+    histogram = read_flux_histogram(flux_file)
+    return histogram.centers, histogram.contents
+
+
+def lookup_xsecs(points, energies, xsecs, mode='nearest'):
+    """
+    Evaluate the cross section table at an array of energies. `xsecs` may
+    also be a 2-D (channels x knots) array of several cross sections sharing
+    the same knot energies, in which case a (channels x points) array is
+    returned.
+
+    mode 'nearest' reproduces the old bin by bin binary search: the value at
+    a knot if the point sits exactly on one, otherwise the value at the knot
+    just below the point (clamped to the first and next-to-last knots).
+    mode 'linear' interpolates linearly between knots (and holds the end
+    values outside of them). modes 'loglinear' and 'cubic' evaluate the
+    spline with a SplineEvaluator of that kind (zero outside the knots).
+    """
+    import numpy as np
+    from genieutils.evaluator import SplineEvaluator
+
+    if mode in ('loglinear', 'cubic'):
+        return SplineEvaluator(energies, xsecs, mode)(points)
+    n = len(energies)
+    if mode == 'linear':
+        if n == 1:
+            return xsecs[..., np.zeros(len(points), dtype=int)]
+        points = np.clip(points, energies[0], energies[-1])
+        idx = np.clip(np.searchsorted(energies, points, side='right') - 1,
+                      0, n - 2)
+        frac = (points - energies[idx]) / (energies[idx + 1] - energies[idx])
+        return xsecs[..., idx] * (1.0 - frac) + xsecs[..., idx + 1] * frac
+    if mode != 'nearest':
+        raise ValueError('Unknown cross section lookup mode: ' + str(mode))
+    idx = np.searchsorted(energies, points, side='left')
+    exact = idx < n
+    exact[exact] = energies[idx[exact]] == points[exact]
+    idx = np.where(exact, idx, idx - 1)
+    idx = np.clip(idx, 0, max(n - 2, 0))
+    return xsecs[..., idx]
+
+
+def convolve(bin_xs, counts, energies, xsecs, emin, emax, mode='nearest'):
+    """
+    Flux-average a cross section table over the flux bins with x values in
+    [emin, emax]. The flux is normalized to unity over the selected bins and
+    the cross section is evaluated between neighbouring bin x values (the
+    last selected bin only contributes to the normalization).
+    """
+    import numpy as np
+
+    keep = (bin_xs >= emin) & (bin_xs <= emax)
+    bin_xs = bin_xs[keep]
+    counts = counts[keep]
+    if len(counts) == 0:
+        return 0.0
+
+    weights = counts[:-1] / counts.sum()
+    points = (bin_xs[:-1] + bin_xs[1:]) / 2.0
+    return float(np.dot(lookup_xsecs(points, energies, xsecs, mode), weights))
+
+
+class LRUCache(object):
+    """
+    A small least-recently-used cache: at most `maxsize` entries are kept and
+    adding one more evicts the entry that was used longest ago.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        if key not in self._entries:
+            return default
+        value = self._entries.pop(key)
+        self._entries[key] = value
+        return value
+
+    def put(self, key, value):
+        self._entries.pop(key, None)
+        self._entries[key] = value
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+flux_cache = LRUCache(maxsize=16)
+xsec_cache = LRUCache(maxsize=64)
+
+
+def _load_cached(cache, reader, file_name):
+    """
+    Return reader(file_name) from `cache`, reading the file only if it is not
+    cached yet (or has changed on disk since). The arrays are shared between
+    callers, so they are made read-only.
+    """
+    import numpy as np
+
+    st = os.stat(split_root_path(file_name)[0])
+    key = (os.path.abspath(file_name), st.st_mtime, st.st_size)
+    arrays = cache.get(key)
+    if arrays is None:
+        arrays = reader(file_name)
+        for array in arrays:
+            if isinstance(array, np.ndarray):
+                array.setflags(write=False)
+        cache.put(key, arrays)
+    return arrays
+
+
+def load_flux_histogram(flux_file):
+    """
+    Cached version of `genieutils.flux.read_flux_histogram`.
+    """
+    return _load_cached(flux_cache, read_flux_histogram, flux_file)
+
+
+def load_flux(flux_file):
+    """
+    Cached version of `read_flux`.
+    """
+    histogram = load_flux_histogram(flux_file)
+    return histogram.centers, histogram.contents
+
+
+def load_xsec_table(xsec_file):
+    """
+    Cached version of `read_xsec_table`.
+    """
+    return _load_cached(xsec_cache, read_xsec_table, xsec_file)
+
+
+def window_scan(bin_xs, counts, energies, xsecs, windows, mode='nearest'):
+    """
+    Flux-averaged cross sections for a whole list of (emin, emax) windows,
+    each giving the same answer as `convolve` over that window. The flux and
+    the flux-weighted cross section are turned into prefix sums once, after
+    which each window costs two binary searches and two subtractions. The
+    bin x values must be increasing (as in any TH1 dump).
+
+    Returns an array with one entry per window (or, for a 2-D `xsecs`, a
+    windows x channels array).
+    """
+    import numpy as np
+
+    windows = np.asarray(windows, dtype=np.float64).reshape(-1, 2)
+    points = (bin_xs[:-1] + bin_xs[1:]) / 2.0
+    weighted = counts[:-1] * lookup_xsecs(points, energies, xsecs, mode)
+    # accumulate in extended precision: narrow windows far out in the tail
+    # are differences of two nearly equal running totals
+    flux_sums = np.concatenate(
+        ([0.0], np.cumsum(counts, dtype=np.longdouble)))
+    weighted_sums = np.concatenate(
+        (np.zeros(weighted.shape[:-1] + (1,)),
+         np.cumsum(weighted, axis=-1, dtype=np.longdouble)), axis=-1)
+
+    lo = np.searchsorted(bin_xs, windows[:, 0], side='left')
+    hi = np.searchsorted(bin_xs, windows[:, 1], side='right')
+    # empty windows (hi == lo) are zeroed below, just keep them in bounds
+    first = np.minimum(lo, len(bin_xs) - 1)
+    last = np.clip(hi - 1, first, len(bin_xs) - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = (weighted_sums[..., last] - weighted_sums[..., first]) / \
+            (flux_sums[hi] - flux_sums[lo])
+    result = np.where(hi > lo, result, 0.0).astype(np.float64)
+    return result.T
+
+
+def fconvolve(flux_file, xsec_file, emin, emax, mode='nearest'):
+    bin_xs, counts = load_flux(flux_file)
+    energies, xsecs = load_xsec_table(xsec_file)
+    return convolve(bin_xs, counts, energies, xsecs, emin, emax, mode)
+
+
+UniverseResult = namedtuple('UniverseResult',
+                            ['table', 'mean', 'covariance'])
+
+
+def read_flux_universes(flux_files):
+    """
+    Read a set of `TH1.Print("all")` dumps with identical binning (e.g. the
+    reweighted universes of one flux) into the shared bin x values and a
+    (universes x bins) array of contents.
+    """
+    import numpy as np
+
+    bin_xs = None
+    universes = []
+    for flux_file in flux_files:
+        xs, counts = load_flux(flux_file)
+        if bin_xs is None:
+            bin_xs = xs
+        elif len(xs) != len(bin_xs) or not np.array_equal(xs, bin_xs):
+            raise ValueError(flux_file + ' does not share the binning of ' +
+                             flux_files[0])
+        universes.append(counts)
+    return bin_xs, np.array(universes)
+
+
+def convolve_universes(bin_xs, universes, xsec_tables, emin, emax,
+                       mode='nearest'):
+    """
+    Flux-average many cross sections over many flux universes at once.
+
+    `universes` is a (universes x bins) array of flux contents sharing the
+    bin x values `bin_xs`; `xsec_tables` is a list of (energies, xsecs)
+    pairs, one per channel, where `xsecs` may also be a (channels x knots)
+    array for channels sharing a knot grid. Each universe is normalized to
+    unity over the bins in [emin, emax], exactly as in `convolve`.
+
+    Returns a UniverseResult holding the (universes x channels) table of
+    flux-averaged cross sections, their mean over universes and the
+    (channels x channels) covariance across universes.
+    """
+    import numpy as np
+
+    universes = np.atleast_2d(np.asarray(universes, dtype=np.float64))
+    keep = (bin_xs >= emin) & (bin_xs <= emax)
+    bin_xs = bin_xs[keep]
+    universes = universes[:, keep]
+    points = (bin_xs[:-1] + bin_xs[1:]) / 2.0
+
+    channels = np.vstack([
+        np.atleast_2d(lookup_xsecs(points, energies, xsecs, mode))
+        for energies, xsecs in xsec_tables])
+    if universes.shape[1] == 0:
+        table = np.zeros((len(universes), len(channels)))
+    else:
+        weights = universes[:, :-1] / universes.sum(axis=1)[:, np.newaxis]
+        table = weights.dot(channels.T)
+
+    if len(table) > 1:
+        covariance = np.atleast_2d(np.cov(table, rowvar=False))
+    else:
+        covariance = np.zeros((len(channels), len(channels)))
+    return UniverseResult(table, table.mean(axis=0), covariance)
+
+
+ToySummary = namedtuple('ToySummary', ['mean', 'rms', 'percentiles'])
+
+TOY_PERCENTILES = [2.5, 16.0, 50.0, 84.0, 97.5]
+
+
+def toy_summaries(histogram, xsec_tables, emin, emax, mode='nearest',
+                  ntoys=1000, method='gaussian', seed=0):
+    """
+    Propagate the bin errors of a FluxHistogram into the flux-averaged cross
+    sections of `xsec_tables` (a list of (energies, xsecs) pairs, as for
+    `convolve_universes`): the flux is fluctuated `ntoys` times with
+    `genieutils.flux.flux_toys` and all the toys go through
+    `convolve_universes` as one (toys x bins) array.
+
+    Returns one ToySummary per channel: the mean and rms over the toys and
+    the TOY_PERCENTILES percentiles.
+    """
+    import numpy as np
+
+    keep = (histogram.centers >= emin) & (histogram.centers <= emax)
+    selected = histogram._replace(centers=histogram.centers[keep],
+                                  contents=histogram.contents[keep],
+                                  errors=histogram.errors[keep])
+    toys = flux_toys(selected, ntoys, method, seed)
+    table = convolve_universes(selected.centers, toys, xsec_tables, emin,
+                               emax, mode).table
+    percentiles = np.percentile(table, TOY_PERCENTILES, axis=0)
+    return [ToySummary(float(column.mean()), float(column.std()),
+                       [float(p) for p in percentiles[:, c]])
+            for c, column in enumerate(table.T)]
+
+
+def group_toys(histograms, group_tables, emin, emax, mode='nearest',
+               ntoys=1000, method='gaussian', seed=0):
+    """
+    `toy_summaries` for `group_tables`, a list with one xsec table per
+    histogram in `histograms` for each group (None for tables to skip). Each
+    histogram is fluctuated once, for the tables of all groups together.
+    Returns the ToySummary (or None) of every table, in the same layout.
+    """
+    summaries = [[None] * len(histograms) for tables in group_tables]
+    for j, histogram in enumerate(histograms):
+        rows = [i for i, tables in enumerate(group_tables)
+                if tables[j] is not None]
+        if not rows:
+            continue
+        for i, summary in zip(rows, toy_summaries(
+                histogram, [group_tables[i][j] for i in rows], emin, emax,
+                mode, ntoys, method, seed)):
+            summaries[i][j] = summary
+    return summaries
+
+
+def window_list(option, opt, value, parser):
+    windows = []
+    for window in value.split(','):
+        try:
+            emin, emax = [float(v) for v in window.split(':')]
+        except ValueError:
+            raise OptionValueError('%s needs emin:emax windows, not %r' %
+                                   (opt, window))
+        if emin >= emax:
+            raise OptionValueError('%s needs emin < emax, not %r' %
+                                   (opt, window))
+        windows.append((emin, emax))
+    setattr(parser.values, option.dest, windows)
+
+
+def window_grid(option, opt, value, parser):
+    import numpy as np
+
+    try:
+        start, stop, step = [float(v) for v in value.split(',')]
+    except ValueError:
+        raise OptionValueError('%s needs start,stop,step, not %r' %
+                               (opt, value))
+    if step <= 0 or stop <= start:
+        raise OptionValueError('%s needs start < stop and step > 0' % opt)
+    # the last window stops at `stop` even if the step doesn't divide the
+    # range (0,20,3 ends with 18:20)
+    nwindows = int(np.ceil((stop - start) / step - 1e-9))
+    edges = start + step * np.arange(nwindows + 1)
+    edges[-1] = min(edges[-1], stop)
+    setattr(parser.values, option.dest, list(zip(edges[:-1], edges[1:])))
+
+
+def flux_list(option, opt, value, parser):
+    flux_files = value.split(',')
+    if len(flux_files) != len(FLUX_FILES):
+        raise OptionValueError('%s needs %d comma separated flux files' %
+                               (opt, len(FLUX_FILES)))
+    setattr(parser.values, option.dest, flux_files)
+
+
+LABELS = ['Anti-electron neutrino', 'Electron neutrino',
+          'Anti-muon neutrino', 'Muon neutrino']
+
+FLUX_FILES = ['electron_antinu_flux.txt', 'electron_nu_flux.txt',
+              'muon_antinu_flux.txt', 'muon_nu_flux.txt']
+
+
+def add_convolution_options(parser):
+    """
+    Add the flux, energy range, lookup mode and window options to an
+    OptionParser.
+    """
+    parser.add_option('-f', '--fluxes', type='string', action='callback',
+                      callback=flux_list, dest='flux_files',
+                      default=FLUX_FILES,
+                      help=r'The four flux files (in the order '
+                      r'%s), as TH1.Print("all") dumps or ROOT files '
+                      r'(file.root or file.root:histogram)'
+                      % ', '.join(LABELS))
+    parser.add_option('-n', '--min', type='float', default=0.0,
+                      help=r'Minimum energy', dest='min_e')
+    parser.add_option('-x', '--max', type='float', default=120.0,
+                      help=r'Maximum energy', dest='max_e')
+    parser.add_option('--mode', type='choice',
+                      choices=['nearest', 'linear', 'loglinear', 'cubic'],
+                      default='nearest', dest='mode',
+                      help=r'Cross section lookup between knots: nearest '
+                      r'(default, knot at or below), linear, loglinear '
+                      r'or cubic')
+    parser.add_option('-w', '--windows', type='string', action='callback',
+                      callback=window_list, dest='windows',
+                      help=r'Scan energy windows, e.g. 0:120,2:20,20:21')
+    parser.add_option('-g', '--scan-grid', type='string', action='callback',
+                      callback=window_grid, dest='windows',
+                      help=r'Scan consecutive windows start,stop,step')
+    parser.add_option('--toys', type='int', default=0, dest='toys',
+                      help=r'Number of flux toys for the uncertainty of '
+                      r'each channel (default 0, none)')
+    parser.add_option('--toy-method', type='choice', choices=TOY_METHODS,
+                      default='gaussian', dest='toy_method',
+                      help=r'Flux fluctuations: gaussian (default) or '
+                      r'poisson')
+    parser.add_option('--seed', type='int', default=0, dest='seed',
+                      help=r'Random seed of the flux toys (default 0)')
+
+
+def check_convolution_options(parser, options):
+    """
+    Reject combinations of the `add_convolution_options` options that make
+    no sense.
+    """
+    if options.toys and options.windows:
+        parser.error('--toys works on the --min/--max range, not --windows')
+    if options.toys < 0:
+        parser.error('--toys needs a positive number of toys')
+
+
+def channel_result(flux, xsec_table, min_e, max_e, mode='nearest',
+                   windows=None):
+    """
+    The flux-averaged cross section of one (energies, xsecs) table over one
+    (bin_xs, counts) flux: a float for [min_e, max_e], or with `windows` a
+    list with one float per window.
+    """
+    bin_xs, counts = flux
+    energies, xsecs = xsec_table
+    if windows:
+        return [float(v) for v in window_scan(bin_xs, counts, energies,
+                                              xsecs, windows, mode)]
+    return convolve(bin_xs, counts, energies, xsecs, min_e, max_e, mode)
+
+
+def print_results(groups, windows=None):
+    """
+    Print flux-averaged cross sections for `groups`, a list of
+    (title, channel, results) where `results` holds one `channel_result` per
+    flux, in the order of LABELS. A group may carry a fourth entry with a
+    ToySummary per flux, printed under each result.
+    """
+    for n, group in enumerate(groups):
+        title, channel, results = group[:3]
+        toys = group[3] if len(group) > 3 else [None] * len(results)
+        if n > 0:
+            print()
+        print(title)
+
+        if windows:
+            print('{0:>8s} {1:>8s}'.format('emin', 'emax') +
+                  ''.join(' {0:>22s}'.format(label) for label in LABELS))
+            for w, (emin, emax) in enumerate(windows):
+                print('{0:8.3f} {1:8.3f}'.format(emin, emax) +
+                      ''.join(' {0:22.10g}'.format(column[w])
+                              for column in results))
+            continue
+
+        for label, xs, summary in zip(LABELS, results, toys):
+            print(label + ' ' + channel + ' total xsec = ' +
+                  str(xs) + ' x 10^(-38) cm2')
+            if summary is not None:
+                print('    toys: mean = {0:.10g}, rms = {1:.4g}, '
+                      '{2}% = {3}'.format(
+                          summary.mean, summary.rms,
+                          '/'.join('%g' % p for p in TOY_PERCENTILES),
+                          ' / '.join('%.10g' % p
+                                     for p in summary.percentiles)))
+
+
+def print_report(groups, fluxes, min_e, max_e, mode='nearest', windows=None,
+                 toys=None):
+    """
+    Print the flux-averaged cross sections of `groups`, a list of
+    (title, channel, xsec_tables) where `xsec_tables` holds one
+    (energies, xsecs) table per flux in `fluxes`, a list of
+    (bin_xs, counts) in the order of LABELS. With `windows` a table of
+    every window is printed for each group instead of the [min_e, max_e]
+    totals. `toys` optionally holds the `group_toys` of the groups.
+    """
+    if toys is None:
+        toys = [[None] * len(fluxes) for group in groups]
+    print_results([(title, channel,
+                    [channel_result(flux, xsec_table, min_e, max_e, mode,
+                                    windows)
+                     for flux, xsec_table in zip(fluxes, xsec_tables)],
+                    summaries)
+                   for (title, channel, xsec_tables), summaries
+                   in zip(groups, toys)], windows)
+
+
+def main(argv=None):
+    from optparse import OptionParser
+
+    parser = OptionParser(usage=__doc__)
+    add_convolution_options(parser)
+    (options, args) = parser.parse_args(argv)
+    check_convolution_options(parser, options)
+
+    carbon_cc_files = ['Electron_Antineutrino_CC_Carbon.txt',
+                       'Electron_Neutrino_CC_Carbon.txt',
+                       'Muon_Antineutrino_CC_Carbon.txt',
+                       'Muon_Neutrino_CC_Carbon.txt']
+
+    carbon_nc_files = ['Electron_Antineutrino_NC_Carbon.txt',
+                       'Electron_Neutrino_NC_Carbon.txt',
+                       'Muon_Antineutrino_NC_Carbon.txt',
+                       'Muon_Neutrino_NC_Carbon.txt']
+
+    hydrogen_cc_files = ['Electron_Antineutrino_CC_Hydrogen.txt',
+                         'Electron_Neutrino_CC_Hydrogen.txt',
+                         'Muon_Antineutrino_CC_Hydrogen.txt',
+                         'Muon_Neutrino_CC_Hydrogen.txt']
+
+    hydrogen_nc_files = ['Electron_Antineutrino_NC_Hydrogen.txt',
+                         'Electron_Neutrino_NC_Hydrogen.txt',
+                         'Muon_Antineutrino_NC_Hydrogen.txt',
+                         'Muon_Neutrino_NC_Hydrogen.txt']
+
+    rein_cc_files = ['ReinDFRPXSec_Electron_Antineutrino_CC_on_Hydrogen.txt',
+                     'ReinDFRPXSec_Electron_Neutrino_CC_on_Hydrogen.txt',
+                     'ReinDFRPXSec_Muon_Antineutrino_CC_on_Hydrogen.txt',
+                     'ReinDFRPXSec_Muon_Neutrino_CC_on_Hydrogen.txt']
+
+    rein_nc_files = ['ReinDFRPXSec_Electron_Antineutrino_NC_on_Hydrogen.txt',
+                     'ReinDFRPXSec_Electron_Neutrino_NC_on_Hydrogen.txt',
+                     'ReinDFRPXSec_Muon_Antineutrino_NC_on_Hydrogen.txt',
+                     'ReinDFRPXSec_Muon_Neutrino_NC_on_Hydrogen.txt']
+
+    rscoh_cc_files = [
+        'ReinSeghalCOHPiPXSec_Electron_Antineutrino_CC_on_Carbon.txt',
+        'ReinSeghalCOHPiPXSec_Electron_Neutrino_CC_on_Carbon.txt',
+        'ReinSeghalCOHPiPXSec_Muon_Antineutrino_CC_on_Carbon.txt',
+        'ReinSeghalCOHPiPXSec_Muon_Neutrino_CC_on_Carbon.txt']
+
+    rscoh_nc_files = [
+        'ReinSeghalCOHPiPXSec_Electron_Antineutrino_NC_on_Carbon.txt',
+        'ReinSeghalCOHPiPXSec_Electron_Neutrino_NC_on_Carbon.txt',
+        'ReinSeghalCOHPiPXSec_Muon_Antineutrino_NC_on_Carbon.txt',
+        'ReinSeghalCOHPiPXSec_Muon_Neutrino_NC_on_Carbon.txt']
+
+    groups = [('CC Carbon', 'CC on Carbon', carbon_cc_files),
+              ('NC Carbon', 'NC on Carbon', carbon_nc_files),
+              ('CC Hydrogen', 'CC on Hydrogen', hydrogen_cc_files),
+              ('NC Hydrogen', 'NC on Hydrogen', hydrogen_nc_files),
+              ('Rein CC Hydrogen', 'CC on Hydrogen', rein_cc_files),
+              ('Rein NC Hydrogen', 'NC on Hydrogen', rein_nc_files),
+              ('Rein-Sehgal COH CC Carbon', 'CC on Carbon', rscoh_cc_files),
+              ('Rein-Sehgal COH NC Carbon', 'NC on Carbon', rscoh_nc_files)]
+
+    histograms = [load_flux_histogram(f) for f in options.flux_files]
+    fluxes = [(h.centers, h.contents) for h in histograms]
+    groups = [(title, channel, [load_xsec_table(f) for f in xsec_files])
+              for title, channel, xsec_files in groups]
+    toys = None
+    if options.toys:
+        toys = group_toys(histograms, [tables for _, _, tables in groups],
+                          options.min_e, options.max_e, options.mode,
+                          options.toys, options.toy_method, options.seed)
+    print_report(groups, fluxes, options.min_e, options.max_e, options.mode,
+                 options.windows, toys)
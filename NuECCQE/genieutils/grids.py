@@ -0,0 +1,93 @@
+"""
+Knot grid bookkeeping for summing and comparing splines.
+
+Splines in one GENIE file usually share a knot grid, but splines from
+different files (or different GENIE versions) need not. A grid is
+identified by a fingerprint of its knot energies, so aligned splines can be
+stacked and reduced directly and only genuinely different grids are
+resampled.
+"""
+from collections import OrderedDict
+import hashlib
+
+import numpy as np
+
+
+def grid_fingerprint(energies):
+    """
+    sha1 hex digest of the knot energies (as contiguous float64).
+    """
+    energies = np.ascontiguousarray(energies, dtype=np.float64)
+    return hashlib.sha1(energies.tobytes()).hexdigest()
+
+
+def spline_grid(spline):
+    """
+    The grid fingerprint of a Spline, computed once and kept on the spline.
+    """
+    if spline.grid is None:
+        spline.grid = grid_fingerprint(spline.energies)
+    return spline.grid
+
+
+def common_grid(grids):
+    """
+    The union of the knots of several grids.
+    """
+    return np.unique(np.concatenate(grids))
+
+
+def resample(energies, xsecs, grid):
+    """
+    Linearly interpolate a spline onto `grid`. Like GENIE, the spline is
+    taken to be zero outside of its knot range.
+    """
+    return np.interp(grid, energies, xsecs, left=0.0, right=0.0)
+
+
+def sum_splines(energies, xsecs, fingerprints=None):
+    """
+    Sum splines given as parallel lists of knot energy and cross section
+    arrays and return (energies, xsecs) of the total.
+
+    Splines on the same grid (same fingerprint) are stacked and reduced in
+    one call. If more than one grid is present, the partial sums are then
+    resampled onto the union of the grids before the final reduction.
+    """
+    if fingerprints is None:
+        fingerprints = [grid_fingerprint(e) for e in energies]
+    groups = OrderedDict()
+    for i, fingerprint in enumerate(fingerprints):
+        groups.setdefault(fingerprint, []).append(i)
+
+    partial_sums = [
+        (energies[members[0]],
+         np.vstack([xsecs[i] for i in members]).sum(axis=0))
+        for members in groups.values()]
+    if len(partial_sums) == 1:
+        return partial_sums[0]
+
+    grid = common_grid([e for e, _ in partial_sums])
+    return grid, np.vstack([resample(e, x, grid)
+                            for e, x in partial_sums]).sum(axis=0)
+
+
+def resample_stack(energies, xsecs, grid):
+    """
+    `resample` for a (splines x knots) stack of splines sharing the knot
+    `energies`: the interpolation indices and weights are worked out once
+    for the whole stack.
+    """
+    xsecs = np.atleast_2d(xsecs)
+    grid = np.asarray(grid, dtype=np.float64)
+    outside = (grid < energies[0]) | (grid > energies[-1])
+    if len(energies) == 1:
+        return np.where(outside, 0.0, xsecs[:, [0]] + 0.0 * grid)
+    idx = np.clip(np.searchsorted(energies, grid, side='right') - 1, 0,
+                  len(energies) - 2)
+    width = energies[idx + 1] - energies[idx]
+    frac = np.where(width > 0, (grid - energies[idx]) /
+                    np.where(width > 0, width, 1.0), 0.0)
+    result = xsecs[:, idx] * (1.0 - frac) + xsecs[:, idx + 1] * frac
+    result[:, outside] = 0.0
+    return result
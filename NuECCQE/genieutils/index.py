@@ -0,0 +1,138 @@
+"""
+Byte-offset index for GENIE spline xml files.
+
+The index is a sidecar text file (`<xml file>.idx`) with one line per
+spline giving its byte offset and length in the xml file, its number of
+knots, the raw algorithm/nu/tgt/proc fields decoded from its name, and the
+name itself. Building it is a single regex scan over the raw bytes, with
+no xml parsing, and afterwards any subset of the splines can be parsed by
+seeking straight to their blocks.
+"""
+from collections import namedtuple
+import json
+import mmap
+import os
+import re
+from xml.etree import ElementTree as ET
+
+from genieutils.cache import file_signature
+from genieutils.names import parse_spline_name
+
+INDEX_VERSION = 1
+
+IndexEntry = namedtuple('IndexEntry', ['offset', 'length', 'nknots',
+                                       'algorithm', 'nu', 'tgt', 'proc',
+                                       'name'])
+
+_spline_tag = re.compile(br'<spline\b([^>]*)>')
+_name_attr = re.compile(br'\bname\s*=\s*"([^"]*)"')
+_nknots_attr = re.compile(br'\bnknots\s*=\s*"(\d+)"')
+_encoding_decl = re.compile(br'<\?xml[^>]*encoding\s*=\s*["\']([^"\']+)')
+_spline_end = b'</spline>'
+
+
+def index_path(xml_file_name):
+    """
+    File name of the index sidecar for `xml_file_name`.
+    """
+    return xml_file_name + '.idx'
+
+
+def scan_splines(xml_file_name):
+    """
+    Scan the raw bytes of a spline file and return (encoding, entries), where
+    entries is a list of IndexEntry in file order. A spline tag without a
+    name attribute is a ValueError.
+    """
+    entries = []
+    encoding = 'utf-8'
+    with open(xml_file_name, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return encoding, entries
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            decl = _encoding_decl.match(data)
+            if decl:
+                encoding = decl.group(1).decode('ascii')
+            for tag in _spline_tag.finditer(data):
+                end = data.find(_spline_end, tag.end())
+                if end < 0:
+                    break
+                attrs = tag.group(1)
+                name = _name_attr.search(attrs)
+                if name is None:
+                    raise ValueError(
+                        'Spline without a name at byte {0} of {1}'.format(
+                            tag.start(), xml_file_name))
+                name = name.group(1).decode(encoding)
+                nknots = _nknots_attr.search(attrs)
+                fields = parse_spline_name(name)
+                entries.append(IndexEntry(
+                    tag.start(), end + len(_spline_end) - tag.start(),
+                    int(nknots.group(1)) if nknots else -1,
+                    fields.get('algorithm', ''), fields.get('nu', ''),
+                    fields.get('tgt', ''), fields.get('proc', ''), name))
+        finally:
+            data.close()
+    return encoding, entries
+
+
+def write_index(xml_file_name, encoding, entries):
+    """
+    Write the index sidecar for `xml_file_name`.
+    """
+    header = {'version': INDEX_VERSION, 'encoding': encoding,
+              'source': file_signature(xml_file_name)}
+    with open(index_path(xml_file_name), 'w') as f:
+        f.write(json.dumps(header) + '\n')
+        for entry in entries:
+            f.write('\t'.join(str(v) for v in entry) + '\n')
+
+
+def read_index(xml_file_name):
+    """
+    Read the index sidecar for `xml_file_name`. Returns (encoding, entries)
+    or None if there is no index or it is out of date.
+    """
+    try:
+        with open(index_path(xml_file_name), 'r') as f:
+            header = json.loads(f.readline())
+            if header.get('version') != INDEX_VERSION or \
+                    header.get('source') != file_signature(xml_file_name):
+                return None
+            entries = []
+            for line in f:
+                bits = line.rstrip('\n').split('\t')
+                entries.append(IndexEntry(int(bits[0]), int(bits[1]),
+                                          int(bits[2]), *bits[3:]))
+    except (IOError, OSError, ValueError):
+        return None
+    return header['encoding'], entries
+
+
+def load_index(xml_file_name):
+    """
+    Return (encoding, entries) for `xml_file_name`, (re)building the sidecar
+    if it is missing or stale.
+    """
+    index = read_index(xml_file_name)
+    if index is None:
+        index = scan_splines(xml_file_name)
+        try:
+            write_index(xml_file_name, *index)
+        except (IOError, OSError):
+            pass
+    return index
+
+
+def iter_indexed_splines(xml_file_name, entries, encoding='utf-8'):
+    """
+    Seek to each of `entries` in the xml file and yield the parsed spline
+    element for it. Only the requested blocks are read from disk.
+    """
+    with open(xml_file_name, 'rb') as f:
+        for entry in sorted(entries, key=lambda e: e.offset):
+            f.seek(entry.offset)
+            parser = ET.XMLParser(encoding=encoding)
+            parser.feed(f.read(entry.length))
+            yield parser.close()
@@ -0,0 +1,30 @@
+"""
+Decoding of GENIE spline names without touching the knots.
+"""
+
+
+def parse_spline_name(name):
+    """
+    Split a GENIE spline name like:
+        'genie::ReinDFRPXSec/Default/nu:-12;tgt:1000010010;N:2212;
+         proc:Weak[CC],DFR;hmult:(p=0,n=0,pi+=0,pi-=1,pi0=0);'
+    into its raw (undecoded) fields:
+    {'algorithm': 'ReinDFRPXSec',
+     'config': 'Default',
+     'nu': '-12',
+     'tgt': '1000010010',
+     'N': '2212',
+     'proc': 'Weak[CC],DFR',
+     'hmult': '(p=0,n=0,pi+=0,pi-=1,pi0=0)'}
+    """
+    components = name.split(';')
+    alg_config_nu = components[0].split('/')
+    fields = {'algorithm': alg_config_nu[0].split('::')[-1]}
+    if len(alg_config_nu) > 2:
+        fields['config'] = alg_config_nu[1]
+    components[0] = alg_config_nu[-1]
+    for component in components:
+        elem = component.split(':', 1)
+        if len(elem) > 1:
+            fields[elem[0]] = elem[1]
+    return fields
@@ -0,0 +1,27 @@
+"""
+Process pool helpers.
+"""
+
+
+def map_in_order(func, items, jobs=1):
+    """
+    Apply `func` to each of `items` and return the results in input order.
+    With jobs > 1 the calls are spread over a pool of that many worker
+    processes (so `func` and the items must be picklable).
+    """
+    items = list(items)
+    if jobs is None or jobs <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    from multiprocessing import Pool
+    pool = Pool(min(jobs, len(items)))
+    try:
+        results = pool.map(func, items, chunksize=1)
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+    return results
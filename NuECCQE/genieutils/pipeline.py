@@ -0,0 +1,316 @@
+'''
+Run the whole README procedure in one process: read the spline files, sum
+and select the channels, and flux-average them, without writing or
+re-reading the intermediate cross section text files.
+Usage:
+    python -m genieutils pipeline <-f>/<-flag> <arg>
+                           -s / --splines     : The MINERvA spline file(s)
+                                                (summed and COH channels)
+                           -d / --dfr-splines : The Rein DFR spline file(s)
+                           -n / --min         : Min energy (default 0)
+                           -x / --max         : Max energy (default 120 GeV)
+                                --mode        : nearest (default), linear,
+                                                loglinear or cubic
+                           -w / --windows     : Energy windows to scan
+                           -g / --scan-grid   : Grid of windows to scan
+                                --toys        : Number of flux toys for the
+                                                uncertainty of each channel
+                                --toy-method  : gaussian (default) or poisson
+                                --seed        : Random seed of the toys
+                           -e / --export      : Also write the cross section
+                                                text files (as sum and print
+                                                would)
+                           -b / --build       : Reuse the results of earlier
+                                                runs whose inputs are
+                                                unchanged
+                                --build-file  : Where -b keeps its results
+                                                (.genieutils-build.json)
+                           -j / --jobs        : Parse the spline file(s) in
+                                                this many processes
+                                --no-cache    : Don't read/write the binary
+                                                spline cache
+
+The flux histograms are read from the current directory, as in `convolve`.
+The cross sections are kept in double precision throughout, so the results
+agree with the text file round trip only to the ~1e-8 precision of those
+files.
+
+With --build every channel (group and flavor) result is recorded under a
+hash of its inputs: the contents of the spline files and flux file it comes
+from, the channel itself, the energy range or windows and the lookup mode.
+A rerun only reads the spline files and fluxes of the channels whose inputs
+changed and reuses the recorded results of the rest. The --toys summaries
+are recorded the same way, under the toy settings as well. Only the
+results of the latest run are kept.
+'''
+from __future__ import print_function
+from collections import namedtuple
+import sys
+
+from genieutils.add_cross_sections import (bucket_splines,
+                                           sum_cross_section_dicts,
+                                           write_sum_of_xsecs)
+from genieutils.build import BUILD_FILE, BuildState
+from genieutils.cli import split_list
+from genieutils.flux import split_root_path
+from genieutils.flux_convolution import (ToySummary, add_convolution_options,
+                                         channel_result,
+                                         check_convolution_options,
+                                         group_toys, load_flux,
+                                         load_flux_histogram, print_results)
+from genieutils.print_splines import write_xsecs
+from genieutils.spline import CC, CURRENT_NAMES, NC, flavor_name
+from genieutils.units import cm2
+
+Group = namedtuple('Group', ['title', 'channel', 'source', 'algorithm',
+                             'target', 'current'])
+
+# neutrino PDG codes in the order of flux_convolution.LABELS (and --fluxes)
+FLAVORS = [-12, 12, -14, 14]
+
+GROUPS = [
+    Group('CC Carbon', 'CC on Carbon', 'splines', None, 1000060120, CC),
+    Group('NC Carbon', 'NC on Carbon', 'splines', None, 1000060120, NC),
+    Group('CC Hydrogen', 'CC on Hydrogen', 'splines', None, 1000010010, CC),
+    Group('NC Hydrogen', 'NC on Hydrogen', 'splines', None, 1000010010, NC),
+    Group('Rein CC Hydrogen', 'CC on Hydrogen', 'dfr_splines',
+          'ReinDFRPXSec', 1000010010, CC),
+    Group('Rein NC Hydrogen', 'NC on Hydrogen', 'dfr_splines',
+          'ReinDFRPXSec', 1000010010, NC),
+    Group('Rein-Sehgal COH CC Carbon', 'CC on Carbon', 'splines',
+          'ReinSeghalCOHPiPXSec', 1000060120, CC),
+    Group('Rein-Sehgal COH NC Carbon', 'NC on Carbon', 'splines',
+          'ReinSeghalCOHPiPXSec', 1000060120, NC),
+]
+
+# the knot range of the text tables written by `sum` and `print`
+TABLE_MIN_E = 0.0
+TABLE_MAX_E = 120.0
+
+
+def source_query(groups):
+    """
+    SplineQuery covering every spline needed by `groups` (all from the same
+    source).
+    """
+    from genieutils.query import SplineQuery
+
+    algorithms = set(g.algorithm for g in groups)
+    return SplineQuery(
+        algorithms=None if None in algorithms else algorithms,
+        flavors=FLAVORS, targets=set(g.target for g in groups),
+        currents=set(CURRENT_NAMES[g.current] for g in groups))
+
+
+def read_spline_sets(sources, groups, use_cache=True, jobs=1):
+    """
+    Read the splines `groups` need from `sources`, a dict of source name ->
+    spline files, into a dict of source name -> list of Splines (leaving
+    out the sources no group uses).
+    """
+    from genieutils.reader import iter_spline_files
+
+    spline_sets = {}
+    for source, spline_files in sources.items():
+        source_groups = [g for g in groups if g.source == source]
+        if source_groups:
+            spline_sets[source] = list(iter_spline_files(
+                spline_files, source_query(source_groups), use_cache, jobs))
+    return spline_sets
+
+
+def group_splines(buckets, group, flavor):
+    """
+    The Splines of one flavor in a group, from the (nu, current, tgt)
+    buckets of the group's source.
+    """
+    splines = buckets.get((flavor, group.current, group.target), [])
+    if group.algorithm is None:
+        return splines
+    return [s for s in splines if s.algorithm == group.algorithm]
+
+
+def xsec_table(splines, min_e=TABLE_MIN_E, max_e=TABLE_MAX_E):
+    """
+    The summed cross section of `splines` as (energies, xsecs in
+    10^(-38) cm2), on the knots in (min_e, max_e) - the same table a text
+    file written by `sum` holds, at full precision. None if there are no
+    splines.
+    """
+    total = sum_cross_section_dicts(splines)
+    if total is None:
+        return None
+    energies, xsecs = total
+    in_range = (energies > min_e) & (energies < max_e)
+    return energies[in_range], xsecs[in_range] / cm2 / 1e-38
+
+
+def group_tables(spline_sets, groups=GROUPS):
+    """
+    Build the cross section tables of `groups` from `spline_sets`, a dict of
+    source name -> list of Splines. Returns a list with, for each group, one
+    `xsec_table` per flavor in FLAVORS (None where there are no splines).
+    """
+    buckets = dict((source, bucket_splines(splines))
+                   for source, splines in spline_sets.items())
+    return [[xsec_table(group_splines(buckets.get(group.source, {}), group,
+                                      flavor))
+             for flavor in FLAVORS]
+            for group in groups]
+
+
+def channel_key(state, group, flavor, spline_files, flux_file, min_e, max_e,
+                mode='nearest', windows=None):
+    """
+    BuildState key of the result for one flavor of a group.
+    """
+    return state.key([state.file_digest(f) for f in spline_files],
+                     group.algorithm, group.target, group.current, flavor,
+                     state.file_digest(split_root_path(flux_file)[0]),
+                     flux_file,
+                     [TABLE_MIN_E, TABLE_MAX_E], mode,
+                     windows if windows else [min_e, max_e])
+
+
+def report_groups(groups, results, toys=None):
+    """
+    (title, channel, results[, toys]) for flux_convolution.print_results,
+    leaving out (with a warning) any group with a flavor that has no
+    splines.
+    """
+    report = []
+    for i, (group, group_results) in enumerate(zip(groups, results)):
+        if any(r is None for r in group_results):
+            print('No splines for ' + group.title + ', skipped',
+                  file=sys.stderr)
+            continue
+        if toys is None:
+            report.append((group.title, group.channel, group_results))
+        else:
+            report.append((group.title, group.channel, group_results,
+                           toys[i]))
+    return report
+
+
+def export_tables(spline_sets, groups=GROUPS):
+    """
+    Write the text files the README procedure would have written for
+    `groups`: the summed tables for groups over all algorithms (as `sum`)
+    and the single spline tables for the others (as `print --models`).
+    """
+    buckets = dict((source, bucket_splines(splines))
+                   for source, splines in spline_sets.items())
+    for group in groups:
+        for flavor in FLAVORS:
+            splines = group_splines(buckets.get(group.source, {}), group,
+                                    flavor)
+            if group.algorithm is None:
+                write_sum_of_xsecs(sum_cross_section_dicts(splines),
+                                   flavor_name(flavor),
+                                   CURRENT_NAMES[group.current],
+                                   group.target, TABLE_MIN_E, TABLE_MAX_E)
+            else:
+                write_xsecs(splines, TABLE_MIN_E, TABLE_MAX_E)
+
+
+def main(argv=None):
+    from optparse import OptionParser
+
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('-s', '--splines', type='string', action='callback',
+                      callback=split_list, dest='spline_files', default=[])
+    parser.add_option('-d', '--dfr-splines', type='string', action='callback',
+                      callback=split_list, dest='dfr_spline_files',
+                      default=[])
+    add_convolution_options(parser)
+    parser.add_option('-e', '--export', default=False, action='store_true',
+                      help=r'Also write the cross section text files',
+                      dest='export')
+    parser.add_option('-b', '--build', default=False, action='store_true',
+                      help=r'Reuse results whose inputs are unchanged',
+                      dest='build')
+    parser.add_option('--build-file', type='string', default=BUILD_FILE,
+                      help=r'Build state file', dest='build_file')
+    parser.add_option('-j', '--jobs', type='int', default=1,
+                      help=r'Number of parsing processes', dest='jobs')
+    parser.add_option('--no-cache', default=True, action='store_false',
+                      help=r'Skip the binary spline cache', dest='use_cache')
+    (options, args) = parser.parse_args(argv)
+    check_convolution_options(parser, options)
+
+    sources = {'splines': options.spline_files,
+               'dfr_splines': options.dfr_spline_files}
+    state = BuildState(options.build_file) if options.build else None
+
+    results = [[None] * len(FLAVORS) for group in GROUPS]
+    toys = [[None] * len(FLAVORS) for group in GROUPS]
+    keys = {}
+    toy_keys = {}
+    todo = set()
+    for i, group in enumerate(GROUPS):
+        for j, flavor in enumerate(FLAVORS):
+            if state is not None:
+                keys[i, j] = channel_key(state, group, flavor,
+                                         sources[group.source],
+                                         options.flux_files[j],
+                                         options.min_e, options.max_e,
+                                         options.mode, options.windows)
+                if options.toys:
+                    toy_keys[i, j] = state.key(keys[i, j], options.toys,
+                                               options.toy_method,
+                                               options.seed)
+                if keys[i, j] in state and not options.export and \
+                        (not options.toys or toy_keys[i, j] in state):
+                    results[i][j] = state.get(keys[i, j])
+                    summary = state.get(toy_keys.get((i, j)))
+                    if summary is not None:
+                        toys[i][j] = ToySummary(*summary)
+                    continue
+            todo.add((i, j))
+
+    todo_groups = sorted(set(i for i, j in todo))
+    spline_sets = read_spline_sets(sources, [GROUPS[i] for i in todo_groups],
+                                   options.use_cache, options.jobs)
+
+    if options.export:
+        export_tables(spline_sets)
+
+    tables = group_tables(spline_sets, [GROUPS[i] for i in todo_groups])
+    for i, xsec_tables in zip(todo_groups, tables):
+        for j, table in enumerate(xsec_tables):
+            if (i, j) not in todo:
+                continue
+            if table is not None:
+                results[i][j] = channel_result(
+                    load_flux(options.flux_files[j]), table, options.min_e,
+                    options.max_e, options.mode, options.windows)
+            if state is not None:
+                state.put(keys[i, j], results[i][j])
+
+    if options.toys:
+        todo_tables = [[table if (i, j) in todo else None
+                        for j, table in enumerate(xsec_tables)]
+                       for i, xsec_tables in zip(todo_groups, tables)]
+        summaries = group_toys([load_flux_histogram(f)
+                                for f in options.flux_files], todo_tables,
+                               options.min_e, options.max_e, options.mode,
+                               options.toys, options.toy_method,
+                               options.seed)
+        for i, group_summaries in zip(todo_groups, summaries):
+            for j, summary in enumerate(group_summaries):
+                if (i, j) not in todo:
+                    continue
+                toys[i][j] = summary
+                if state is not None:
+                    state.put(toy_keys[i, j],
+                              None if summary is None else list(summary))
+
+    if state is not None:
+        state.save()
+        total = len(GROUPS) * len(FLAVORS)
+        print('Reused {0} of {1} channel results'.format(
+            total - len(todo), total), file=sys.stderr)
+
+    print_results(report_groups(GROUPS, results,
+                                toys if options.toys else None),
+                  options.windows)
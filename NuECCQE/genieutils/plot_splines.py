@@ -0,0 +1,301 @@
+'''
+Plot the splines in GENIE spline files (circa 2.9.N) against the BEBC
+diffractive pion production data.
+Usage:
+    python -m genieutils plot <-f>/<-flag> <arg>
+    (or python plot_splines.py <-f>/<-flag> <arg> in Diffractive/)
+                           -c / --cm2         : Plot cross seciton in cm^{2}
+                           -s / --splines spline1,spline2,spline3,...
+                           -a / --all         : Plot every spline on its own
+                                                instead
+                                --pdf         : With --all, write all the
+                                                plots to this multi-page pdf
+                                --nu-data     : The muon neutrino data
+                                                (./bebc_neutrino_data.csv)
+                                --anu-data    : The muon antineutrino data
+                                                (./bebc_antineutrino_data.csv)
+                           -j / --jobs        : Parse the spline files (and
+                                                render --all plots) in this
+                                                many processes
+                                --no-cache    : Don't read/write the binary
+                                                spline cache
+
+The BEBC data are read from bebc_neutrino_data.csv and
+bebc_antineutrino_data.csv in the current directory unless --nu-data and
+--anu-data say otherwise.
+
+Plots are drawn on their own figures on the non-interactive Agg canvas, so
+nothing depends on a display or on pyplot's global figure. With dvipng
+around the axis titles are typeset with TeX; they are the same on every
+plot, so TeX runs for them once (matplotlib keeps the result in its tex
+cache) and the spline titles are drawn without it. --all --pdf renders the
+pages in this process, since a pdf can only be written from one; without
+--pdf each plot goes to its own file and -j spreads them over the workers.
+'''
+from __future__ import print_function
+
+from functools import partial
+import os
+import re
+
+from genieutils.bebc import ANU_DATA, NU_DATA, read_bebc_data
+from genieutils.cli import split_list
+from genieutils.parallel import map_in_order
+from genieutils.spline import CC
+from genieutils.units import cm2
+
+_dvipng = None
+
+
+def has_dvipng():
+    """
+    Whether dvipng (needed for TeX labels) is on the PATH. Only looked up the
+    first time it is asked for.
+    """
+    global _dvipng
+    if _dvipng is None:
+        try:
+            from shutil import which
+        except ImportError:
+            from distutils.spawn import find_executable as which
+        _dvipng = which('dvipng') is not None
+    return _dvipng
+
+
+_configured = False
+
+
+def _configure():
+    """
+    Set the fonts (and TeX, if dvipng is around) once per process.
+    """
+    global _configured
+    if not _configured:
+        import matplotlib
+
+        matplotlib.rc('font', **{'family': 'sans-serif',
+                                 'sans-serif': ['Helvetica']})
+        if has_dvipng():
+            matplotlib.rc('text', usetex=True)
+        _configured = True
+
+
+def _figure():
+    """
+    A new figure with one set of axes, on its own Agg canvas (so neither
+    pyplot nor a display is involved).
+    """
+    _configure()
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    return figure, figure.add_subplot(111)
+
+
+def _save(figure, file_name, pdf=None):
+    if pdf is not None:
+        pdf.savefig(figure)
+    else:
+        figure.savefig(file_name + ".pdf")
+
+
+def spline_title(spline):
+    """
+    Plot title for a spline, e.g.
+    'ReinDFRPXSec Muon Neutrino CC on Hydrogen'.
+    """
+    return spline.algorithm + " " + spline.flavor + " " + \
+        spline.current_name + " on " + spline.target
+
+
+def get_xyaxis_titles_total_xsec(plot_cm2):
+    y_axis_title = r''
+    if has_dvipng():
+        y_axis_title = r'Cross Section (per GeV$^{-2}$)'
+        if plot_cm2:
+            y_axis_title = r'Cross Section (per $10^{-39}$ cm$^{2}$)'
+    else:
+        y_axis_title = r'Cross Section (per GeV^(-2))'
+        if plot_cm2:
+            y_axis_title = r'Cross Section (per 10^(-39) cm^2)'
+
+    x_axis_title = r'Neutrino Energy (GeV)'
+
+    return (x_axis_title, y_axis_title)
+
+
+def warm_label_cache(plot_cm2):
+    """
+    Typeset the axis titles once, into matplotlib's tex cache, so that
+    worker processes started afterwards find them there instead of each
+    running TeX on the same labels. Nothing to do without TeX.
+    """
+    if not has_dvipng():
+        return
+    import io
+
+    figure, axes = _figure()
+    x_axis_title, y_axis_title = get_xyaxis_titles_total_xsec(plot_cm2)
+    axes.set_xlabel(x_axis_title)
+    axes.set_ylabel(y_axis_title)
+    figure.savefig(io.BytesIO(), format='pdf')
+
+
+def plot_xsec_dict(spline, plot_cm2, file_name=None, pdf=None):
+    """
+    Plot a spline to file_name.pdf (named after its title by default), or
+    as the next page of the PdfPages `pdf`. Returns the file name.
+    """
+    title = spline_title(spline)
+    if file_name is None:
+        file_name = re.sub(r'\s+', '_', title)
+
+    figure, axes = _figure()
+    x_axis_title, y_axis_title = get_xyaxis_titles_total_xsec(plot_cm2)
+
+    energies = spline.energies
+    xsecs = spline.xsecs / cm2 / 1e-39 if plot_cm2 else spline.xsecs
+
+    axes.plot(energies, xsecs)
+    axes.set_xlabel(x_axis_title)
+    axes.set_ylabel(y_axis_title)
+    axes.set_title(title, usetex=False)
+    _save(figure, file_name, pdf)
+    return file_name
+
+
+def plot_data_and_xsec_dict(spline, filenam, pdf=None):
+    import matplotlib.lines as mlines
+
+    figure, axes = _figure()
+
+    data = read_bebc_data(filenam)
+    axes.errorbar(data.centers, data.xsecs / 1e-39,
+                  xerr=(data.highs - data.lows) / 2.0,
+                  yerr=(data.unc_highs - data.unc_lows) / 2.0 / 1e-39,
+                  fmt='o', color='black')
+
+    title = spline_title(spline)
+
+    print(title)
+
+    energies = spline.energies
+    xsecs = spline.xsecs / cm2 / 1e-39
+
+    x_axis_title, y_axis_title = get_xyaxis_titles_total_xsec(True)
+
+    axes.plot(energies, xsecs, color='red')
+    axes.set_xlabel(x_axis_title)
+    axes.set_ylabel(y_axis_title)
+    axes.set_xlim([0, 105])
+    axes.set_ylim([0, 5])
+    axes.set_title(title, usetex=False)
+
+    red_line = mlines.Line2D([], [], color='red', label='GENIE 2.8.6')
+    black_pts = mlines.Line2D([], [], color='black', marker='o',
+                              linestyle='None', label='BEBC Data')
+    axes.legend(handles=[red_line, black_pts], numpoints=1, loc=0)
+
+    _save(figure, re.sub(r'\s+', '_', title), pdf)
+
+
+def plot_file_names(splines):
+    """
+    A file name (without .pdf) for each spline, for plotting them one by
+    one: the name plot_xsec_dict would pick, with _2, _3, ... added to
+    repeated titles so no plot overwrites another.
+    """
+    seen = {}
+    names = []
+    for spline in splines:
+        name = re.sub(r'\s+', '_', spline_title(spline))
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            name = '{0}_{1}'.format(name, seen[name])
+        names.append(name)
+    return names
+
+
+def _plot_batch(batch, plot_cm2):
+    return [plot_xsec_dict(spline, plot_cm2, file_name)
+            for spline, file_name in batch]
+
+
+def plot_all(splines, plot_cm2, pdf_file=None, jobs=1):
+    """
+    Plot every spline on its own: all as pages of the multi-page pdf
+    `pdf_file`, or else each to its own file, in batches spread over `jobs`
+    processes. Returns the list of files written.
+    """
+    warm_label_cache(plot_cm2)
+    if pdf_file is not None:
+        from matplotlib.backends.backend_pdf import PdfPages
+
+        with PdfPages(pdf_file) as pdf:
+            for spline in splines:
+                plot_xsec_dict(spline, plot_cm2, pdf=pdf)
+        return [pdf_file]
+
+    items = list(zip(splines, plot_file_names(splines)))
+    # a few batches per process, so uneven batches even out
+    size = max(1, -(-len(items) // (4 * max(jobs, 1))))
+    batches = [items[i:i + size] for i in range(0, len(items), size)]
+    return [file_name + ".pdf"
+            for names in map_in_order(partial(_plot_batch,
+                                              plot_cm2=plot_cm2),
+                                      batches, jobs)
+            for file_name in names]
+
+
+def main(argv=None):
+    from optparse import OptionParser
+
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('-c', '--cm2', dest='plot_cm2', default=False,
+                      help=r'Plot in cm^{2}', action='store_true')
+    parser.add_option('-s', '--splines', type='string', action='callback',
+                      callback=split_list, dest='spline_files')
+    parser.add_option('-a', '--all', dest='all', default=False,
+                      help=r'Plot every spline on its own',
+                      action='store_true')
+    parser.add_option('--pdf', type='string', default=None, dest='pdf',
+                      help=r'Write the --all plots to one multi-page pdf')
+    parser.add_option('--nu-data', type='string', default=NU_DATA,
+                      help=r'The muon neutrino data', dest='nu_data')
+    parser.add_option('--anu-data', type='string', default=ANU_DATA,
+                      help=r'The muon antineutrino data', dest='anu_data')
+    parser.add_option('-j', '--jobs', type='int', default=1,
+                      help=r'Number of parsing processes', dest='jobs')
+    parser.add_option('--no-cache', default=True, action='store_false',
+                      help=r'Skip the binary spline cache', dest='use_cache')
+    (options, args) = parser.parse_args(argv)
+    if not options.all:
+        for data_file in (options.nu_data, options.anu_data):
+            if not os.path.isfile(data_file):
+                parser.error('no BEBC data file ' + data_file +
+                             ' (see --nu-data/--anu-data)')
+
+    from genieutils.reader import iter_spline_files
+
+    nu_spline = None
+    anu_spline = None
+    splines = []
+    for s in iter_spline_files(options.spline_files,
+                               use_cache=options.use_cache,
+                               jobs=options.jobs):
+        print(s.description)
+        if options.all:
+            splines.append(s)
+        if s.nu == 14 and s.current == CC:
+            nu_spline = s
+        if s.nu == -14 and s.current == CC:
+            anu_spline = s
+
+    if options.all:
+        plot_all(splines, options.plot_cm2, options.pdf, options.jobs)
+        return
+
+    plot_data_and_xsec_dict(nu_spline, options.nu_data)
+    plot_data_and_xsec_dict(anu_spline, options.anu_data)
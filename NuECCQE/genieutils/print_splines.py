@@ -0,0 +1,79 @@
+'''
+Write the cross sections of the splines in GENIE spline files (circa 2.9.N)
+to one text file per spline.
+Usage:
+    python -m genieutils print <-f>/<-flag> <arg>
+    (or python print_splines.py <-f>/<-flag> <arg>)
+                           -s / --splines spline1,spline2,spline3,...
+                           -m / --models model1,model2,model3,..
+                           -n / --min         : Min energy (default 0)
+                           -x / --max         : Max energy (default 120 GeV)
+                           -j / --jobs        : Parse the spline file(s) in
+                                                this many processes
+                                --no-cache    : Don't read/write the binary
+                                                spline cache
+
+Note: the default for models is 'all of them'. If you add the models flag,
+you may restrict the output to just what is requested.
+'''
+from __future__ import print_function
+
+from genieutils.cli import split_list
+from genieutils.units import cm2
+
+
+def write_xsecs(splines, min_e, max_e):
+    """
+    write the xsecs to file, with filename based on flavor, current, and
+    target in the e-range defined by min_e and max_e
+    """
+    import re
+
+    import numpy as np
+
+    for spline in splines:
+
+        title = spline.algorithm + " " + spline.flavor + " " + \
+            spline.current_name + " on " + spline.target + ".txt"
+        file_name = re.sub(r'\s+', '_', title)
+
+        energies = spline.energies
+        in_range = (energies > min_e) & (energies < max_e)
+        energies = energies[in_range]
+        xs = spline.xsecs[in_range] / cm2 / 1e-38
+        xssum = xs.sum()
+        seen_max_e = energies[-1] if len(energies) else 0.0
+
+        with open(file_name, "w") as f:
+            np.savetxt(f, np.column_stack((energies, xs)),
+                       fmt='%10.5f:  %12.8f x 10^(-38) cm2')
+
+            print("Erange " + str(min_e) + " to " + str(seen_max_e) +
+                  " sum = " + str(xssum) + " x 10^(-38) cm^2", file=f)
+
+
+def main(argv=None):
+    from optparse import OptionParser
+
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('-n', '--min', type='float', default=0.0,
+                      help=r'Minimum energy', dest='min_e')
+    parser.add_option('-x', '--max', type='float', default=120.0,
+                      help=r'Maximum energy', dest='max_e')
+    parser.add_option('-s', '--splines', type='string', action='callback',
+                      callback=split_list, dest='spline_files')
+    parser.add_option('-m', '--models', type='string', action='callback',
+                      callback=split_list, dest='models')
+    parser.add_option('-j', '--jobs', type='int', default=1,
+                      help=r'Number of parsing processes', dest='jobs')
+    parser.add_option('--no-cache', default=True, action='store_false',
+                      help=r'Skip the binary spline cache', dest='use_cache')
+    (options, args) = parser.parse_args(argv)
+
+    from genieutils.reader import iter_spline_files, models_query
+
+    query = models_query(options.models)
+    splines = list(iter_spline_files(options.spline_files, query,
+                                     options.use_cache, options.jobs))
+
+    write_xsecs(splines, options.min_e, options.max_e)
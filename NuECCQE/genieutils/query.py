@@ -0,0 +1,157 @@
+"""
+Spline selection on the spline name alone, pushed down below knot parsing.
+
+A SplineQuery only needs the `name` attribute of a spline to decide whether
+it is wanted, so it can be applied to the byte-offset index before any
+knots are parsed. The spline cache stores the decoded fields as columns,
+which are filtered before any Spline is built. Splines that have already
+been built are checked on their decoded fields.
+"""
+from functools import partial
+
+from genieutils.cache import iter_cache_rows, iter_cached_splines, read_meta
+from genieutils.chunked import iter_chunked_splines
+from genieutils.files import is_compressed
+from genieutils.index import iter_indexed_splines, load_index
+from genieutils.names import parse_spline_name
+from genieutils.spline import current_code, current_from_proc_code
+
+
+def _as_set(values, normalize=str):
+    if values is None:
+        return None
+    if not isinstance(values, (list, tuple, set, frozenset)):
+        values = [values]
+    return frozenset(normalize(v) for v in values)
+
+
+class SplineQuery(object):
+    """
+    Select splines by algorithm, neutrino flavor PDG, target PDG, current
+    ('CC'/'NC'), struck nucleon PDG (`N`) and hadron multiplicity (`hmult`).
+    Each filter is a value or a collection of accepted values; None (the
+    default) accepts anything. PDG codes may be given as ints or strings.
+    """
+
+    def __init__(self, algorithms=None, flavors=None, targets=None,
+                 currents=None, nucleons=None, hmults=None):
+        self.algorithms = _as_set(algorithms)
+        self.flavors = _as_set(flavors)
+        self.targets = _as_set(targets)
+        self.currents = _as_set(currents, lambda c: str(c).upper())
+        self.nucleons = _as_set(nucleons)
+        self.hmults = _as_set(hmults)
+        # the same filters in the form of the decoded Spline fields
+        self._nu = _as_set(flavors, int)
+        self._tgt = _as_set(targets, int)
+        self._current = _as_set(currents, current_code)
+        self._nucleon = _as_set(nucleons, int)
+
+    def matches_fields(self, fields):
+        """
+        Check the raw fields returned by `parse_spline_name`.
+        """
+        if self.algorithms is not None and \
+                fields.get('algorithm') not in self.algorithms:
+            return False
+        if self.flavors is not None and fields.get('nu') not in self.flavors:
+            return False
+        if self.targets is not None and fields.get('tgt') not in self.targets:
+            return False
+        if self._current is not None and \
+                current_from_proc_code(fields.get('proc', '')) not in \
+                self._current:
+            return False
+        if self.nucleons is not None and fields.get('N') not in self.nucleons:
+            return False
+        if self.hmults is not None and fields.get('hmult') not in self.hmults:
+            return False
+        return True
+
+    def matches(self, name):
+        """
+        Check a spline `name` attribute.
+        """
+        return self.matches_fields(parse_spline_name(name))
+
+    def matches_spline(self, spline):
+        """
+        Check the decoded fields of a Spline.
+        """
+        if self.algorithms is not None and \
+                spline.algorithm not in self.algorithms:
+            return False
+        if self._nu is not None and spline.nu not in self._nu:
+            return False
+        if self._tgt is not None and spline.tgt not in self._tgt:
+            return False
+        if self._current is not None and spline.current not in self._current:
+            return False
+        if self._nucleon is not None and spline.nucleon not in self._nucleon:
+            return False
+        if self.hmults is not None and spline.hmult not in self.hmults:
+            return False
+        return True
+
+    def matching_rows(self, columns):
+        """
+        Indices of the matching splines of a spline cache, checked on the
+        decoded field `columns` it stores (lists of Spline field values by
+        field name) without building any Spline.
+        """
+        rows = range(len(columns['nu']))
+        for field, accepted in (('algorithm', self.algorithms),
+                                ('nu', self._nu), ('tgt', self._tgt),
+                                ('current', self._current),
+                                ('nucleon', self._nucleon),
+                                ('hmult', self.hmults)):
+            if accepted is not None:
+                values = columns[field]
+                rows = [i for i in rows if values[i] in accepted]
+        return list(rows)
+
+
+def iter_query_splines(xml_file_name, query, reader, process_spline,
+                       use_cache=True, jobs=1):
+    """
+    Iterate over the Splines of `xml_file_name` that match `query` (None
+    matches everything).
+
+    - With a valid spline cache the rows are picked from the decoded field
+      columns of the cache and only their Splines and knots are touched.
+    - Otherwise, with a query, the byte-offset index is filtered by name and
+      only the matching spline blocks are parsed with `process_spline`.
+    - Otherwise the whole file is streamed through `reader` (building the
+      cache on the way if `use_cache`).
+
+    With jobs > 1 the xml is parsed in chunks by that many worker processes
+    instead (see genieutils.chunked).
+
+    Compressed files can't be indexed or split, so they are always streamed
+    through `reader` (and cached if `use_cache`).
+    """
+    meta = read_meta(xml_file_name) if use_cache else None
+    if meta is not None:
+        return iter_cache_rows(
+            xml_file_name, meta,
+            None if query is None else query.matching_rows(meta['columns']))
+
+    if is_compressed(xml_file_name):
+        # no seeking into a compressed stream: read it through in one go
+        # (and cache it, so this only happens once)
+        splines = iter_cached_splines(xml_file_name, reader, use_cache)
+        if query is None:
+            return splines
+        return (s for s in splines if query.matches_spline(s))
+
+    chunked = jobs > 1
+    if query is None:
+        if chunked:
+            reader = partial(iter_chunked_splines, jobs=jobs)
+        return iter_cached_splines(xml_file_name, reader, use_cache)
+    encoding, entries = load_index(xml_file_name)
+    entries = [e for e in entries if query.matches(e.name)]
+    if chunked:
+        return iter_chunked_splines(xml_file_name, entries, jobs)
+    return (process_spline(spline) for spline in
+            iter_indexed_splines(xml_file_name, entries, encoding))
@@ -0,0 +1,195 @@
+'''
+Expected event rates of every pipeline channel, per flux energy bin.
+Usage:
+    python -m genieutils rates <-f>/<-flag> <arg>
+                           -s / --splines     : The MINERvA spline file(s)
+                                                (summed and COH channels)
+                           -d / --dfr-splines : The Rein DFR spline file(s)
+                           -t / --targets     : Target masses in kg, as
+                                                pdg:kg,... (e.g.
+                                                1000060120:5400,1000010010:450)
+                           -p / --pot         : Exposure in protons on target
+                           -f / --fluxes      : The four flux files
+                                --flux-area   : Flux per m2 (default) or cm2
+                                                per POT
+                           -n / --min         : Min energy (default 0)
+                           -x / --max         : Max energy (default 120 GeV)
+                                --mode        : nearest (default), linear,
+                                                loglinear or cubic
+                           -o / --output      : The rate matrix file
+                                                (event_rates.npz)
+                           -j / --jobs        : Parse the spline file(s) in
+                                                this many processes
+                                --no-cache    : Don't read/write the binary
+                                                spline cache
+
+The fluxes are taken as absolute (neutrinos per area per POT in each bin).
+If the contents of a flux don't add up to the `Total sum=` of its TH1.Print
+header they are scaled to it. Only the bins of the histogram axis are
+used: the underflow and overflow bins are left out. Each target is made of
+nuclei of mass number A weighing A atomic mass units, and the cross
+sections are the GENIE ones per nucleus, evaluated at the bin centers.
+
+The (channels x bins) matrix of expected events is written with numpy.savez
+as `rates`, along with the bin `edges` and `centers`, the channel `labels`,
+the `targets` and `flavors` (PDG codes) of each channel and the `pot`. The
+total of every channel is printed.
+'''
+from __future__ import print_function
+from optparse import OptionValueError
+import sys
+
+from genieutils.cli import split_list
+from genieutils.flux import absolute_contents
+from genieutils.flux_convolution import (FLUX_FILES, LABELS, flux_list,
+                                         load_flux_histogram, lookup_xsecs)
+from genieutils.pipeline import (FLAVORS, GROUPS, group_tables,
+                                 read_spline_sets)
+from genieutils.spline import target_name
+from genieutils.units import centimeter, meter
+
+ATOMIC_MASS_UNIT = 1.66053906660e-27  # kg
+
+FLUX_AREAS = {'m2': (centimeter / meter) ** 2, 'cm2': 1.0}
+
+
+def mass_number(pdg):
+    """
+    Mass number A of a `10LZZZAAAI` PDG ion code.
+    """
+    return (int(pdg) // 10) % 1000
+
+
+def target_nuclei(pdg, mass):
+    """
+    Number of nuclei of the PDG ion `pdg` in `mass` kg of it.
+    """
+    return mass / (mass_number(pdg) * ATOMIC_MASS_UNIT)
+
+
+def rate_matrix(bin_xs, fluxes, xsec_tables, nuclei, pot, mode='nearest'):
+    """
+    Expected events per channel and bin: `fluxes` is a (channels x bins)
+    array of absolute fluxes per cm2 per POT at the bin x values `bin_xs`,
+    `xsec_tables` one (energies, xsecs in 10^(-38) cm2) table per channel
+    and `nuclei` the number of target nuclei of each channel. All channels
+    are looked up and multiplied out as one (channels x bins) array.
+    """
+    import numpy as np
+
+    xsecs = np.vstack([lookup_xsecs(bin_xs, energies, table_xsecs, mode)
+                       for energies, table_xsecs in xsec_tables])
+    return pot * 1e-38 * np.asarray(nuclei)[:, np.newaxis] * fluxes * xsecs
+
+
+def target_masses(option, opt, value, parser):
+    masses = {}
+    for target in value.split(','):
+        try:
+            pdg, mass = target.split(':')
+            masses[int(pdg)] = float(mass)
+        except ValueError:
+            raise OptionValueError('%s needs pdg:kg pairs, not %r' %
+                                   (opt, target))
+    setattr(parser.values, option.dest, masses)
+
+
+def main(argv=None):
+    from optparse import OptionParser
+
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('-s', '--splines', type='string', action='callback',
+                      callback=split_list, dest='spline_files', default=[])
+    parser.add_option('-d', '--dfr-splines', type='string', action='callback',
+                      callback=split_list, dest='dfr_spline_files',
+                      default=[])
+    parser.add_option('-t', '--targets', type='string', action='callback',
+                      callback=target_masses, dest='masses', default={},
+                      help=r'Target masses in kg, as pdg:kg,...')
+    parser.add_option('-p', '--pot', type='float', default=1.0,
+                      help=r'Exposure in protons on target', dest='pot')
+    parser.add_option('-f', '--fluxes', type='string', action='callback',
+                      callback=flux_list, dest='flux_files',
+                      default=FLUX_FILES,
+                      help=r'The four flux files (in the order %s)'
+                      % ', '.join(LABELS))
+    parser.add_option('--flux-area', type='choice',
+                      choices=sorted(FLUX_AREAS), default='m2',
+                      dest='flux_area',
+                      help=r'Flux per m2 (default) or cm2 per POT')
+    parser.add_option('-n', '--min', type='float', default=0.0,
+                      help=r'Minimum energy', dest='min_e')
+    parser.add_option('-x', '--max', type='float', default=120.0,
+                      help=r'Maximum energy', dest='max_e')
+    parser.add_option('--mode', type='choice',
+                      choices=['nearest', 'linear', 'loglinear', 'cubic'],
+                      default='nearest', dest='mode',
+                      help=r'Cross section lookup between knots')
+    parser.add_option('-o', '--output', type='string',
+                      default='event_rates.npz', dest='output',
+                      help=r'The rate matrix file')
+    parser.add_option('-j', '--jobs', type='int', default=1,
+                      help=r'Number of parsing processes', dest='jobs')
+    parser.add_option('--no-cache', default=True, action='store_false',
+                      help=r'Skip the binary spline cache', dest='use_cache')
+    (options, args) = parser.parse_args(argv)
+    if not options.masses:
+        parser.error('--targets needs at least one target mass')
+
+    import numpy as np
+
+    groups = []
+    for group in GROUPS:
+        if group.target in options.masses:
+            groups.append(group)
+        else:
+            print('No mass for ' + target_name(group.target) + ', ' +
+                  group.title + ' skipped', file=sys.stderr)
+
+    histograms = [load_flux_histogram(f) for f in options.flux_files]
+    for flux_file, histogram in zip(options.flux_files, histograms):
+        if not np.array_equal(histogram.centers, histograms[0].centers):
+            parser.error(flux_file + ' does not share the binning of ' +
+                         options.flux_files[0])
+    # the underflow and overflow bins hold all the flux outside the axis,
+    # not flux at their nominal x, so only the axis bins get rates
+    bin_xs = histograms[0].centers[1:-1]
+    edges = histograms[0].edges[1:-1]
+    keep = (bin_xs >= options.min_e) & (bin_xs <= options.max_e)
+    fluxes = np.array([absolute_contents(h)[1:-1]
+                       for h in histograms])[:, keep] * \
+        FLUX_AREAS[options.flux_area]
+
+    sources = {'splines': options.spline_files,
+               'dfr_splines': options.dfr_spline_files}
+    tables = group_tables(read_spline_sets(sources, groups,
+                                           options.use_cache, options.jobs),
+                          groups)
+
+    channels = []
+    for group, xsec_tables in zip(groups, tables):
+        if any(table is None for table in xsec_tables):
+            print('No splines for ' + group.title + ', skipped',
+                  file=sys.stderr)
+            continue
+        for j, table in enumerate(xsec_tables):
+            channels.append((LABELS[j] + ' ' + group.channel + ' (' +
+                             group.title + ')', group.target, j, table))
+    if not channels:
+        parser.error('no channel has both splines and a target mass')
+
+    labels, targets, flux_index, xsec_tables = zip(*channels)
+    nuclei = [target_nuclei(t, options.masses[t]) for t in targets]
+    rates = rate_matrix(bin_xs[keep], fluxes[list(flux_index)],
+                        list(xsec_tables), nuclei, options.pot, options.mode)
+
+    np.savez(options.output, rates=rates,
+             edges=edges[np.append(keep, False) | np.append(False, keep)],
+             centers=bin_xs[keep], labels=np.array(labels),
+             targets=np.array(targets),
+             flavors=np.array([FLAVORS[j] for j in flux_index]),
+             pot=options.pot)
+
+    for label, total in zip(labels, rates.sum(axis=1)):
+        print(label + ' events = ' + str(total))
+    print('Wrote ' + options.output, file=sys.stderr)
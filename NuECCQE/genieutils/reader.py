@@ -0,0 +1,109 @@
+"""
+Reading the splines of GENIE spline xml files into Spline records.
+
+All the commands read splines through here, so they share the byte-offset
+index, the binary spline cache and the chunk-parallel parser.
+"""
+from functools import partial
+from xml.etree import ElementTree as ET
+
+import numpy as np
+
+from genieutils.files import open_spline_file
+from genieutils.parallel import map_in_order
+from genieutils.query import SplineQuery, iter_query_splines
+from genieutils.spline import Spline
+
+
+def process_spline(spline):
+    """
+    Transform a spline (object) from an ElementTree retrieval
+    into a Spline record. The knots are stored as contiguous float64 arrays,
+    filled in one go from the knot text.
+    """
+    energies = np.array([e.text for e in spline.iterfind('./knot/E')],
+                        dtype=np.float64)
+    xsecs = np.array([x.text for x in spline.iterfind('./knot/xsec')],
+                     dtype=np.float64)
+    return Spline(spline.get('name'), energies, xsecs)
+
+
+def iter_splines(xml_file_name):
+    """
+    Stream the spline elements out of an xml file one at a time. Each
+    element is cleared (and dropped from the root) once the caller moves on,
+    so memory use stays flat no matter how large the spline file is.
+    Compressed (.gz, .bz2, .xz) files are decompressed as they are read.
+    """
+    with open_spline_file(xml_file_name) as xml_file:
+        context = ET.iterparse(xml_file, events=('start', 'end'))
+        _, root = next(context)
+        for event, elem in context:
+            if event == 'end' and elem.tag == 'spline':
+                yield elem
+                elem.clear()
+                root.clear()
+
+
+def iter_xsec_dicts(xml_file_name):
+    """
+    Generator version of `xml_to_list_of_dicts` - yield the Spline for
+    each spline as soon as it has been read.
+    """
+    for spline in iter_splines(xml_file_name):
+        yield process_spline(spline)
+
+
+def xml_to_list_of_dicts(xml_file_name):
+    """
+    Take an xml file and return a list of Spline records, holding the
+    spline name, its decoded fields and arrays of knot energies and cross
+    sections.
+    """
+    return list(iter_xsec_dicts(xml_file_name))
+
+
+def models_query(models):
+    """
+    SplineQuery for a collection of algorithm names, or None (everything)
+    if the collection is empty or contains 'all'.
+    """
+    if not models or 'all' in models:
+        return None
+    return SplineQuery(algorithms=models)
+
+
+def read_spline_file(spline_file, query=None, use_cache=True, jobs=1):
+    """
+    List of the Splines matching `query` in one file. With jobs > 1 the file
+    is split into chunks parsed in that many processes.
+    """
+    return list(iter_query_splines(spline_file, query, iter_xsec_dicts,
+                                   process_spline, use_cache, jobs))
+
+
+def iter_spline_files(spline_files, query=None, use_cache=True, jobs=1):
+    """
+    Stream the Splines matching `query` out of several files.
+    With jobs > 1 several files are parsed in a process pool instead, and
+    the results are handed back in input order; a single file is split into
+    chunks parsed in parallel.
+    """
+    if jobs > 1 and len(spline_files) == 1:
+        for spline in read_spline_file(spline_files[0], query, use_cache,
+                                       jobs):
+            yield spline
+        return
+
+    if jobs > 1 and len(spline_files) > 1:
+        for splines in map_in_order(partial(read_spline_file, query=query,
+                                            use_cache=use_cache),
+                                    spline_files, jobs):
+            for spline in splines:
+                yield spline
+        return
+
+    for spline_file in spline_files:
+        for spline in iter_query_splines(spline_file, query, iter_xsec_dicts,
+                                         process_spline, use_cache):
+            yield spline
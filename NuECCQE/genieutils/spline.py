@@ -0,0 +1,171 @@
+"""
+Compact record for one GENIE spline.
+
+The fields of the spline name are decoded once, when the record is built:
+PDG codes become ints, the current becomes one of the CC/NC codes below and
+the remaining strings are interned, so the thousands of splines of a file
+share a single copy of each algorithm, proc and hmult string. Grouping and
+filtering on these fields are plain int (or identity) comparisons.
+"""
+import sys
+
+from genieutils.names import parse_spline_name
+
+try:
+    _intern = sys.intern
+except AttributeError:
+    _intern = intern  # noqa: F821 (python 2)
+
+UNKNOWN_CURRENT, CC, NC = 0, 1, 2
+
+CURRENT_NAMES = {UNKNOWN_CURRENT: 'Unknown Current', CC: 'CC', NC: 'NC'}
+
+FLAVOR_NAMES = {
+    -16: 'Tau Antineutrino',
+    -14: 'Muon Antineutrino',
+    -12: 'Electron Antineutrino',
+    12: 'Electron Neutrino',
+    14: 'Muon Neutrino',
+    16: 'Tau Neutrino'
+}
+
+# the decoded name fields of a Spline, as stored by the spline cache
+FIELDS = ('algorithm', 'config', 'nu', 'tgt', 'nucleon', 'proc', 'current',
+          'hmult')
+
+TARGET_NAMES = {
+    1000010010: 'Hydrogen',
+    1000060120: 'Carbon',
+    1000080160: 'Oxygen'
+}
+
+
+def current_code(current):
+    """
+    CC or NC code for a current name ('CC'/'NC', any case).
+    """
+    return {'CC': CC, 'NC': NC}.get(str(current).upper(), UNKNOWN_CURRENT)
+
+
+def current_from_proc_code(proc):
+    """
+    CC or NC code for a raw proc field (e.g. 'Weak[CC],DFR').
+    """
+    if '[CC]' in proc:
+        return CC
+    if '[NC]' in proc:
+        return NC
+    return UNKNOWN_CURRENT
+
+
+def flavor_name(nu):
+    """
+    Name of a neutrino PDG code.
+    """
+    return FLAVOR_NAMES.get(nu, 'Unknown')
+
+
+def target_name(tgt):
+    """
+    Name of a target PDG ion code.
+    """
+    return TARGET_NAMES.get(tgt, 'PDG Ion Code: ' + str(tgt))
+
+
+def _pdg(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class Spline(object):
+    """
+    One spline: its name, the decoded name fields and the knot arrays.
+
+    `nu`, `tgt` and `nucleon` are PDG ints (0 if absent), `current` is CC,
+    NC or UNKNOWN_CURRENT, `algorithm`, `config`, `proc` and `hmult` are
+    interned strings. `grid` holds the knot grid fingerprint once something
+    has asked for it (see genieutils.grids.spline_grid).
+    """
+    __slots__ = ('name', 'algorithm', 'config', 'nu', 'tgt', 'nucleon',
+                 'proc', 'current', 'hmult', 'energies', 'xsecs', 'grid')
+
+    def __init__(self, name, energies, xsecs):
+        fields = parse_spline_name(name)
+        proc = fields.get('proc', '')
+        self.name = name
+        self.algorithm = _intern(fields['algorithm'])
+        self.config = _intern(fields.get('config', ''))
+        self.nu = _pdg(fields.get('nu'))
+        self.tgt = _pdg(fields.get('tgt'))
+        self.nucleon = _pdg(fields.get('N'))
+        self.proc = _intern(proc)
+        self.current = current_from_proc_code(proc)
+        self.hmult = _intern(fields.get('hmult', ''))
+        self.energies = energies
+        self.xsecs = xsecs
+        self.grid = None
+
+    @classmethod
+    def from_fields(cls, name, fields, energies, xsecs):
+        """
+        Build a Spline from its already decoded name `fields` (the values of
+        FIELDS, in that order) without parsing the name again.
+        """
+        spline = cls.__new__(cls)
+        spline.name = name
+        (algorithm, config, spline.nu, spline.tgt, spline.nucleon, proc,
+         spline.current, hmult) = fields
+        spline.algorithm = _intern(algorithm)
+        spline.config = _intern(config)
+        spline.proc = _intern(proc)
+        spline.hmult = _intern(hmult)
+        spline.energies = energies
+        spline.xsecs = xsecs
+        spline.grid = None
+        return spline
+
+    @property
+    def fields(self):
+        """
+        The decoded name fields, in FIELDS order.
+        """
+        return tuple(getattr(self, field) for field in FIELDS)
+
+    def __reduce__(self):
+        # slots and no __dict__: rebuild from the name instead
+        return (Spline, (self.name, self.energies, self.xsecs))
+
+    def __repr__(self):
+        return 'Spline({0!r}, <{1} knots>)'.format(self.name,
+                                                   len(self.energies))
+
+    @property
+    def flavor(self):
+        return flavor_name(self.nu)
+
+    @property
+    def current_name(self):
+        return CURRENT_NAMES[self.current]
+
+    @property
+    def target(self):
+        return target_name(self.tgt)
+
+    @property
+    def description(self):
+        """
+        The algorithm, the flavor name and the raw name fields that follow
+        the neutrino, e.g.
+        {'algorithm': 'ReinSeghalCOHPiPXSec',
+         'flavor': 'Muon Antineutrino',
+         'tgt': '1000060120',
+         'proc': 'Weak[CC],COH',
+         'hmult': '(p=0,n=0,pi+=0,pi-=1,pi0=0)'}
+        """
+        description = {'algorithm': self.algorithm, 'flavor': self.flavor}
+        for key, value in parse_spline_name(self.name).items():
+            if key not in ('algorithm', 'config', 'nu'):
+                description[key] = value
+        return description
@@ -0,0 +1,6 @@
+"""
+Natural unit conversions. GENIE stores cross sections in GeV^-2.
+"""
+meter = 5.07e+15  # 5.07e+15 / GeV
+centimeter = 0.01 * meter
+cm2 = centimeter * centimeter
@@ -0,0 +1,25 @@
+"""
+Shared fixtures for the genieutils tests. Run them from NuECCQE with
+`python -m pytest tests`.
+"""
+import os
+import shutil
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(TESTS_DIR, 'fixtures')
+
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+
+@pytest.fixture
+def spline_file(tmpdir):
+    """
+    A private copy of the fixture spline file, so the index and cache
+    sidecars of a test are written next to it and not into the tree.
+    """
+    file_name = str(tmpdir.join('splines.xml'))
+    shutil.copy(os.path.join(FIXTURES_DIR, 'splines.xml'), file_name)
+    return file_name
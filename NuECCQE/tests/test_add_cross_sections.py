@@ -0,0 +1,55 @@
+"""
+The single pass over the splines in add_cross_sections buckets them like
+one query per flavor, current and target would, and writes the same files.
+"""
+import os
+
+from genieutils.add_cross_sections import bucket_splines, main
+from genieutils.query import SplineQuery
+from genieutils.reader import xml_to_list_of_dicts
+from genieutils.spline import CC, NC
+
+
+def test_bucket_splines(spline_file):
+    splines = xml_to_list_of_dicts(spline_file)
+    buckets = bucket_splines(splines)
+    assert sum(len(b) for b in buckets.values()) == len(splines)
+    assert sorted(buckets) == sorted(set((s.nu, s.current, s.tgt)
+                                         for s in splines))
+    assert [s.name for s in buckets[(14, CC, 1000010010)]] == \
+        [splines[1].name]
+    assert (14, NC, 1000010010) in buckets
+    for (nu, current, tgt), bucket in buckets.items():
+        query = SplineQuery(flavors=[nu], targets=[tgt],
+                            currents=['CC' if current == CC else 'NC'])
+        # same splines, in file order
+        assert [s.name for s in bucket] == \
+            [s.name for s in splines if query.matches_spline(s)]
+    assert bucket_splines([]) == {}
+
+
+def written_files(directory):
+    files = {}
+    for name in sorted(os.listdir(str(directory))):
+        with open(str(directory.join(name))) as f:
+            files[name] = f.read()
+    return files
+
+
+def test_one_pass_matches_separate_runs(spline_file, tmpdir, capsys):
+    together = tmpdir.mkdir('together')
+    with together.as_cwd():
+        main(['-s', spline_file, '-t', '1000010010,1000060120',
+              '--currents', 'cc,NC', '--no-cache'])
+
+    separate = tmpdir.mkdir('separate')
+    with separate.as_cwd():
+        for target in ('1000010010', '1000060120'):
+            main(['-s', spline_file, '-t', target, '--no-cache'])
+            main(['-s', spline_file, '-t', target, '--nc', '--no-cache'])
+    capsys.readouterr()
+
+    files = written_files(together)
+    assert 'Muon_Neutrino_NC_Hydrogen.txt' in files
+    assert 'Muon_Antineutrino_CC_Carbon.txt' in files
+    assert files == written_files(separate)
@@ -0,0 +1,73 @@
+"""
+The BEBC scoring averages the splines over the data bins and turns the
+chi-squares into p-values correctly.
+"""
+import numpy as np
+import pytest
+
+from genieutils.bebc import bin_averages, chi2_sf
+from genieutils.grids import resample
+from genieutils.reader import xml_to_list_of_dicts
+
+
+def test_bin_averages_known_values():
+    energies = np.array([0.0, 1.0, 2.0, 3.0])
+    xsecs = np.array([0.0, 1.0, 1.0, 3.0])
+    lows = np.array([0.0, 0.5, 2.0, 2.5, -1.0, 1.25])
+    highs = np.array([1.0, 1.5, 3.0, 4.0, 0.0, 1.75])
+    np.testing.assert_allclose(
+        bin_averages(energies, xsecs, lows, highs),
+        [[0.5, 0.875, 2.0, 1.25 / 1.5, 0.0, 1.0]], rtol=1e-15, atol=0.0)
+    # a single knot has nothing to integrate
+    np.testing.assert_array_equal(
+        bin_averages(energies[:1], xsecs[:1], lows, highs),
+        np.zeros((1, len(lows))))
+
+
+def test_bin_averages_of_splines(spline_file):
+    splines = xml_to_list_of_dicts(spline_file)[:4]
+    energies = splines[0].energies
+    xsecs = np.vstack([s.xsecs for s in splines])
+    lows = np.array([0.0, 0.1, 2.0, 5.0, 30.0, 90.0])
+    highs = np.array([0.2, 1.0, 5.0, 30.0, 60.0, 150.0])
+    averages = bin_averages(energies, xsecs, lows, highs)
+    assert averages.shape == (len(splines), len(lows))
+    for spline, row in zip(splines, averages):
+        for low, high, average in zip(lows, highs, row):
+            # the integral of the piecewise linear spline over the part of
+            # the bin within its knots
+            points = np.union1d(
+                np.clip([low, high], energies[0], energies[-1]),
+                energies[(energies > low) & (energies < high)])
+            values = resample(energies, spline.xsecs, points)
+            integral = np.sum(np.diff(points) *
+                              (values[1:] + values[:-1]) / 2.0)
+            assert average == pytest.approx(integral / (high - low),
+                                            rel=1e-12, abs=1e-30)
+
+
+@pytest.mark.parametrize('chi2,dof,p', [
+    (3.841458820694124, 1, 0.05),
+    (5.991464547107979, 2, 0.05),
+    (7.814727903251178, 3, 0.05),
+    (9.487729036781154, 4, 0.05),
+    (18.307038053275146, 10, 0.05),
+    (6.634896601021214, 1, 0.01),
+    (15.08627246938899, 5, 0.01),
+    (1.0, 1, 0.31731050786291415),
+    (4.0, 4, 0.40600584970983811),
+    (0.0, 3, 1.0),
+])
+def test_chi2_sf_known_values(chi2, dof, p):
+    assert float(chi2_sf(chi2, dof)) == pytest.approx(p, rel=1e-12)
+
+
+def test_chi2_sf_arrays():
+    chi2 = np.linspace(0.0, 40.0, 81)
+    for dof in range(1, 12):
+        p = chi2_sf(chi2, dof)
+        assert p.shape == chi2.shape
+        assert p[0] == pytest.approx(1.0)
+        assert np.all(np.diff(p) < 0)
+        # more degrees of freedom, larger p-values
+        assert np.all(chi2_sf(chi2[1:], dof + 1) > p[1:])
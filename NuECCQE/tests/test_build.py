@@ -0,0 +1,126 @@
+"""
+BuildState reuses the results of unchanged inputs and drops the rest.
+"""
+import json
+import os
+
+import genieutils.cache
+from genieutils.build import BUILD_VERSION, BuildState
+
+
+def test_results_are_reused(tmpdir):
+    path = str(tmpdir.join('build.json'))
+    state = BuildState(path)
+    assert state.results == {}
+    key = state.key('channel', [0.0, 120.0], 'nearest')
+    assert key == state.key('channel', [0.0, 120.0], 'nearest')
+    assert key != state.key('channel', [0.0, 20.0], 'nearest')
+    assert key not in state
+    state.put(key, [1.5, 2.5])
+    state.save()
+
+    state = BuildState(path)
+    assert key in state
+    assert state.get(key) == [1.5, 2.5]
+    assert state.get('missing', 'default') == 'default'
+
+
+def test_unused_results_are_dropped(tmpdir):
+    path = str(tmpdir.join('build.json'))
+    state = BuildState(path)
+    state.put('old', 1.0)
+    state.put('kept', 2.0)
+    state.save()
+
+    state = BuildState(path)
+    assert state.get('kept') == 2.0
+    state.put('new', 3.0)
+    state.save()
+    assert BuildState(path).results == {'kept': 2.0, 'new': 3.0}
+
+
+def test_other_versions_are_ignored(tmpdir):
+    path = tmpdir.join('build.json')
+    path.write(json.dumps({'version': BUILD_VERSION + 1, 'files': {},
+                           'results': {'key': 1.0}}))
+    assert BuildState(str(path)).results == {}
+    path.write('{"version": ')
+    assert BuildState(str(path)).results == {}
+
+
+def test_file_digest(spline_file, tmpdir, monkeypatch):
+    hashed = []
+
+    def file_hash(file_name):
+        hashed.append(file_name)
+        return real_file_hash(file_name)
+
+    real_file_hash = genieutils.cache.file_hash
+    monkeypatch.setattr(genieutils.cache, 'file_hash', file_hash)
+    path = str(tmpdir.join('build.json'))
+    state = BuildState(path)
+    digest = state.file_digest(spline_file)
+    assert digest == real_file_hash(spline_file)
+    assert state.file_digest(spline_file) == digest
+    assert len(hashed) == 1
+    state.save()
+
+    # an unchanged file is not hashed again by the next run
+    state = BuildState(path)
+    assert state.file_digest(spline_file) == digest
+    assert len(hashed) == 1
+
+    # a touched file is, but keeps its digest (and so its results)
+    st = os.stat(spline_file)
+    os.utime(spline_file, (st.st_atime, st.st_mtime + 10))
+    assert state.file_digest(spline_file) == digest
+    assert len(hashed) == 2
+
+    # a changed file gets a new digest
+    with open(spline_file, 'a') as f:
+        f.write('\n')
+    assert state.file_digest(spline_file) != digest
+    assert state.key(state.file_digest(spline_file)) != state.key(digest)
+
+
+def test_pipeline_reruns_only_changed_inputs(spline_file, tmpdir,
+                                             monkeypatch, capsys):
+    from genieutils import pipeline
+    from genieutils.flux_convolution import FLUX_FILES
+
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for flux_file in FLUX_FILES:
+        tmpdir.join(flux_file).write(
+            open(os.path.join(package_dir, flux_file)).read())
+    dfr_file = str(tmpdir.join('dfr.xml'))
+    with open(spline_file) as f, open(dfr_file, 'w') as out:
+        out.write(f.read())
+
+    read = []
+
+    def read_spline_sets(sources, groups, use_cache=True, jobs=1):
+        read.append(sorted(g.title for g in groups))
+        return real_read_spline_sets(sources, groups, use_cache, jobs)
+
+    real_read_spline_sets = pipeline.read_spline_sets
+    monkeypatch.setattr(pipeline, 'read_spline_sets', read_spline_sets)
+    argv = ['-s', spline_file, '-d', dfr_file, '-b', '--no-cache']
+
+    def run(extra=()):
+        pipeline.main(argv + list(extra))
+        return capsys.readouterr().err.splitlines()[0]
+
+    with tmpdir.as_cwd():
+        assert run() == 'Reused 0 of 32 channel results'
+        assert run() == 'Reused 32 of 32 channel results'
+        assert read[1] == []
+
+        # only the Rein groups come from the changed file
+        with open(dfr_file, 'a') as f:
+            f.write('\n')
+        assert run() == 'Reused 24 of 32 channel results'
+        assert read[2] == ['Rein CC Hydrogen', 'Rein NC Hydrogen']
+
+        # a new energy range is a new result for every channel
+        assert run(['--max', '20']) == 'Reused 0 of 32 channel results'
+        assert len(read[3]) == len(pipeline.GROUPS)
@@ -0,0 +1,47 @@
+"""
+The subcommands answer --help and usage errors without importing numpy
+or the spline readers.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from genieutils.cli import COMMANDS
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ('numpy', 'matplotlib', 'genieutils.reader', 'genieutils.cache',
+         'genieutils.query')
+
+CHECK = '''
+import sys
+from genieutils.cli import main
+try:
+    main(sys.argv[1:])
+except SystemExit:
+    pass
+print("loaded:" + ",".join(sorted(m for m in sys.modules
+                                  if m.startswith(%r))))
+'''
+
+
+def imported_modules(argv, tmpdir):
+    env = dict(os.environ, PYTHONPATH=PACKAGE_DIR)
+    output = subprocess.check_output(
+        [sys.executable, '-c', CHECK % (HEAVY,)] + argv, env=env,
+        cwd=str(tmpdir), stderr=subprocess.STDOUT)
+    return output.decode().splitlines()[-1]
+
+
+@pytest.mark.parametrize('command', sorted(COMMANDS))
+def test_help_stays_light(command, tmpdir):
+    assert imported_modules([command, '--help'], tmpdir) == 'loaded:'
+
+
+@pytest.mark.parametrize('argv', [['sum', '--bogus'], ['diff', 'one.xml'],
+                                  ['convolve', '--windows', '2-20'],
+                                  ['score', '--nu-data', 'missing.csv']])
+def test_usage_errors_stay_light(argv, tmpdir):
+    assert imported_modules(argv, tmpdir) == 'loaded:'
@@ -0,0 +1,101 @@
+"""
+compare_splines gives, batch by batch, the relative differences of a pair by
+pair comparison, and diff_spline_files matches splines across files.
+"""
+import numpy as np
+import pytest
+
+from genieutils.diff import (compare_splines, description_key,
+                             diff_spline_files)
+from genieutils.grids import resample, resample_stack
+from genieutils.reader import xml_to_list_of_dicts
+from genieutils.spline import Spline
+
+
+def pair_differences(old, new, emin=None, emax=None):
+    # one pair at a time, straight from the definition
+    grid = np.union1d(old.energies, new.energies)
+    if emin is not None:
+        grid = grid[grid >= emin]
+    if emax is not None:
+        grid = grid[grid <= emax]
+    old_xsecs = resample(old.energies, old.xsecs, grid)
+    new_xsecs = resample(new.energies, new.xsecs, grid)
+    diffs = [abs(n - o) / max(abs(o), abs(n))
+             for o, n in zip(old_xsecs, new_xsecs) if o or n]
+    if not diffs:
+        return 0.0, 0.0
+    return max(diffs), sum(diffs) / len(diffs)
+
+
+def changed(spline, energies=None, scale=1.0):
+    if energies is None:
+        energies = spline.energies
+    xsecs = np.interp(energies, spline.energies, spline.xsecs) * scale
+    return Spline(spline.name, np.asarray(energies, dtype=np.float64), xsecs)
+
+
+def test_resample_stack(spline_file):
+    splines = xml_to_list_of_dicts(spline_file)[:4]
+    energies = splines[0].energies
+    grid = np.concatenate(([0.001], np.geomspace(0.01, 100.0, 50), [150.0]))
+    np.testing.assert_allclose(
+        resample_stack(energies, np.vstack([s.xsecs for s in splines]),
+                       grid),
+        [resample(energies, s.xsecs, grid) for s in splines],
+        rtol=1e-12, atol=0.0)
+
+
+def test_compare_splines(spline_file):
+    splines = xml_to_list_of_dicts(spline_file)
+    coarse = splines[0].energies[::2]
+    pairs = [(s, s) for s in splines[:2]]
+    pairs += [(s, changed(s, scale=1.1)) for s in splines[2:5]]
+    pairs += [(s, changed(s, coarse)) for s in splines[:2]]
+    pairs += [(splines[5], changed(splines[5], splines[5].energies[2:]))]
+
+    max_diff, mean_diff = compare_splines(pairs)
+    np.testing.assert_array_equal(max_diff[:2], 0.0)
+    np.testing.assert_allclose(max_diff[2:5], 0.1 / 1.1, rtol=1e-12)
+    np.testing.assert_allclose(mean_diff[2:5], 0.1 / 1.1, rtol=1e-12)
+    # a threshold that moved up counts as 100%
+    assert max_diff[-1] == 1.0
+    for emin, emax in ((None, None), (1.0, 20.0), (200.0, None)):
+        max_diff, mean_diff = compare_splines(pairs, emin, emax)
+        expected = np.array([pair_differences(old, new, emin, emax)
+                             for old, new in pairs])
+        np.testing.assert_allclose(max_diff, expected[:, 0], rtol=1e-12,
+                                   atol=1e-15)
+        np.testing.assert_allclose(mean_diff, expected[:, 1], rtol=1e-12,
+                                   atol=1e-15)
+
+
+def test_diff_spline_files(spline_file, tmpdir):
+    splines = xml_to_list_of_dicts(spline_file)
+    with open(spline_file) as f:
+        text = f.read()
+    # a renamed configuration, a moved spline and a dropped one
+    text = text.replace('QPMDISPXSec/CC-Default/', 'QPMDISPXSec/CC-Tuned/')
+    first = text[text.index('<spline '):text.index('</spline>') + 9]
+    text = text.replace(first, first.replace(
+        '<xsec> 1.198457013e-15 </xsec>', '<xsec> 1.5e-15 </xsec>'))
+    dropped = text.index('<spline name="' + splines[5].name)
+    text = text[:dropped] + text[text.index('</spline>', dropped) + 9:]
+    new_file = str(tmpdir.join('new.xml'))
+    with open(new_file, 'w') as f:
+        f.write(text)
+
+    differences, only_old, only_new = diff_spline_files(
+        spline_file, new_file, use_cache=False)
+    keys = [description_key(s) for s in splines]
+    assert [key for key, _, _ in differences] == keys[:5] + keys[6:]
+    assert only_old == [keys[5]]
+    assert only_new == []
+    assert differences[0][1] == pytest.approx(1 - 1.198457013 / 1.5)
+    assert all(max_diff == 0.0 for _, max_diff, _ in differences[1:])
+
+    # by configuration the renamed one no longer matches
+    differences, only_old, only_new = diff_spline_files(
+        spline_file, new_file, match_config=True, use_cache=False)
+    assert len(differences) == len(splines) - 2
+    assert len(only_old) == 2 and len(only_new) == 1
@@ -0,0 +1,164 @@
+"""
+SplineEvaluator: exactness on the data each kind can represent, GENIE's
+guards and stacked channels.
+"""
+import numpy as np
+import pytest
+
+from genieutils.evaluator import (SplineEvaluator, _second_derivatives,
+                                  _solve_tridiagonal)
+from genieutils.reader import xml_to_list_of_dicts
+
+
+def cubic(x):
+    return 2.0 + 0.5 * x - 0.3 * x ** 2 + 0.04 * x ** 3
+
+
+@pytest.fixture
+def knots():
+    # uneven spacing, as in a uselog spline file
+    return np.array([0.5, 0.8, 1.5, 2.0, 3.7, 4.1, 6.0, 7.5, 9.0])
+
+
+def test_linear_is_exact_on_linear_data(knots):
+    points = np.linspace(knots[0], knots[-1], 101)
+    evaluator = SplineEvaluator(knots, 3.0 + 2.0 * knots, 'linear')
+    np.testing.assert_allclose(evaluator(points), 3.0 + 2.0 * points,
+                               rtol=1e-13)
+
+
+def test_loglinear_is_exact_on_data_linear_in_log(knots):
+    points = np.linspace(knots[0], knots[-1], 101)
+    evaluator = SplineEvaluator(knots, 3.0 + 2.0 * np.log(knots),
+                                'loglinear')
+    np.testing.assert_allclose(evaluator(points), 3.0 + 2.0 * np.log(points),
+                               rtol=1e-13)
+
+
+def test_cubic_reproduces_a_cubic(knots):
+    # not-a-knot end conditions are exact for a single cubic
+    points = np.linspace(knots[0], knots[-1], 101)
+    evaluator = SplineEvaluator(knots, cubic(knots), 'cubic')
+    np.testing.assert_allclose(evaluator(points), cubic(points), rtol=1e-11)
+    np.testing.assert_allclose(evaluator(knots), cubic(knots), rtol=1e-13)
+
+
+@pytest.mark.parametrize('n', [4, 5, 6, 50])
+def test_cubic_reproduces_a_cubic_on_any_number_of_knots(n):
+    rng = np.random.RandomState(n)
+    knots = np.cumsum(rng.uniform(0.1, 1.0, n))
+    points = np.linspace(knots[0], knots[-1], 57)
+    np.testing.assert_allclose(
+        SplineEvaluator(knots, cubic(knots))(points), cubic(points),
+        rtol=1e-9)
+
+
+def parabola(x):
+    return 1.0 + (x - 2.0) ** 2
+
+
+def test_cubic_on_three_knots_is_the_parabola():
+    knots = np.array([1.0, 2.5, 3.0])
+    points = np.linspace(1.0, 3.0, 21)
+    np.testing.assert_allclose(
+        SplineEvaluator(knots, parabola(knots))(points), parabola(points),
+        rtol=1e-13)
+
+
+def test_cubic_on_two_knots_is_the_line():
+    evaluator = SplineEvaluator([1.0, 3.0], [2.0, 6.0])
+    np.testing.assert_allclose(evaluator([1.0, 1.5, 2.0, 3.0]),
+                               [2.0, 3.0, 4.0, 6.0], rtol=1e-14)
+
+
+def test_lone_knot():
+    evaluator = SplineEvaluator([2.0], [5.0])
+    np.testing.assert_array_equal(evaluator([1.0, 2.0, 3.0]),
+                                  [0.0, 5.0, 0.0])
+
+
+def test_zero_knots_are_joined_linearly():
+    # a threshold: the segments touching a zero knot must not ring
+    knots = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+    xsecs = np.array([0.0, 0.0, 1.0, 5.0, 6.0, 6.5])
+    evaluator = SplineEvaluator(knots, xsecs)
+    np.testing.assert_array_equal(evaluator([1.0, 1.5, 2.0]), 0.0)
+    np.testing.assert_allclose(evaluator([2.25, 2.5, 2.75]),
+                               [0.25, 0.5, 0.75], rtol=1e-14)
+    # the segments away from the threshold stay cubic
+    linear = SplineEvaluator(knots, xsecs, 'linear')
+    assert abs(evaluator([4.5]) - linear([4.5]))[0] > 1e-3
+
+
+def test_negative_values_are_clamped():
+    # the cubic through these dips below zero between the last knots
+    knots = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    xsecs = np.array([4.0, 1.0, 0.2, 0.01, 1.0])
+    points = np.linspace(1.0, 5.0, 401)
+    curve = SplineEvaluator(knots, xsecs)(points)
+    assert curve.min() == 0.0
+    assert (curve == 0.0).any()
+    # and it is the clamped polynomial, which does go below zero
+    evaluator = SplineEvaluator(knots, xsecs)
+    c0, c1, c2, c3 = evaluator._coeffs
+    idx = np.clip(np.searchsorted(knots, points, side='right') - 1, 0, 3)
+    dx = points - knots[idx]
+    raw = c0[idx] + dx * (c1[idx] + dx * (c2[idx] + dx * c3[idx]))
+    assert raw.min() < 0.0
+    np.testing.assert_array_equal(curve, np.maximum(raw, 0.0))
+
+
+@pytest.mark.parametrize('kind', ['linear', 'loglinear', 'cubic'])
+def test_zero_outside_the_knots(knots, kind):
+    evaluator = SplineEvaluator(knots, cubic(knots) + 1.0, kind)
+    outside = [0.0, 0.1, knots[0] - 1e-9, knots[-1] + 1e-9, 100.0]
+    np.testing.assert_array_equal(evaluator(outside), 0.0)
+    assert (evaluator(knots) > 0.0).all()
+
+
+@pytest.mark.parametrize('kind', ['linear', 'loglinear', 'cubic'])
+def test_stacked_channels_match_each_row(spline_file, kind):
+    splines = xml_to_list_of_dicts(spline_file)
+    energies = splines[0].energies
+    stacked = np.vstack([s.xsecs for s in splines
+                         if np.array_equal(s.energies, energies)])
+    assert len(stacked) > 1
+    points = np.logspace(-2.5, 2.5, 203)
+    result = SplineEvaluator(energies, stacked, kind)(points)
+    assert result.shape == (len(stacked), len(points))
+    for row, xsecs in zip(result, stacked):
+        np.testing.assert_allclose(
+            row, SplineEvaluator(energies, xsecs, kind)(points),
+            rtol=1e-13, atol=0.0)
+
+
+def test_tridiagonal_solve_matches_dense():
+    rng = np.random.RandomState(11)
+    n = 40
+    lower = rng.uniform(0.1, 1.0, n)
+    upper = rng.uniform(0.1, 1.0, n)
+    diag = 2.0 + lower + upper
+    rhs = rng.normal(size=(n, 3))
+    dense = np.diag(diag) + np.diag(lower[1:], -1) + np.diag(upper[:-1], 1)
+    np.testing.assert_allclose(_solve_tridiagonal(lower, diag, upper, rhs),
+                               np.linalg.solve(dense, rhs), rtol=1e-12)
+
+
+@pytest.mark.parametrize('n', [4, 5, 9, 200])
+def test_second_derivatives_solve_the_not_a_knot_system(n):
+    rng = np.random.RandomState(n)
+    x = np.cumsum(rng.uniform(0.05, 1.0, n))
+    y = rng.normal(size=(n, 2))
+    h = np.diff(x)
+    d = np.diff(y, axis=0) / h[:, np.newaxis]
+    m = _second_derivatives(h, d)
+    # interior continuity of the first derivative
+    np.testing.assert_allclose(
+        h[:-1, np.newaxis] * m[:-2] + 2.0 * (h[:-1] + h[1:])[:, np.newaxis] *
+        m[1:-1] + h[1:, np.newaxis] * m[2:], 6.0 * (d[1:] - d[:-1]),
+        rtol=1e-9, atol=1e-9)
+    # not-a-knot: the third derivative is continuous at the second and
+    # next-to-last knots
+    third = np.diff(m, axis=0) / h[:, np.newaxis]
+    np.testing.assert_allclose(third[0], third[1], rtol=1e-8, atol=1e-8)
+    np.testing.assert_allclose(third[-1], third[-2], rtol=1e-8, atol=1e-8)
@@ -0,0 +1,124 @@
+"""
+Flux dumps parse the same through the bulk conversion and the regex
+fallback, and the flux toys fluctuate the bins within their errors.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from genieutils.flux import (_flux_line, flux_toys, parse_flux_text,
+                             read_flux_text)
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DUMP = """TH1.Print Name  = flux, Entries= 100, Total sum= 7.5
+ fSumw[0]=0, x=-0.05, error=0
+ fSumw[1]=1.5, x=0.05, error=0.5
+ fSumw[2]=2.5e+00, x=0.15, error=1.25e-1
+ fSumw[3]=3.5, x=0.25, error=0.75
+ fSumw[4]=9, x=0.35, error=3
+"""
+
+# the same bins, laid out loosely enough to defeat the bulk conversion
+LOOSE_DUMP = """TH1.Print Name  = flux, Entries= 100, Total sum= 7.5
+ fSumw[0] = 0, x = -0.05, error = 0
+ fSumw[1]=1.5,  x=0.05,  error=0.5
+ fSumw[2]=2.5e+00, x=0.15, error=1.25e-1
+ fSumw[3]=3.5, x=0.25, error=0.75
+ fSumw[4]=9, x=0.35, error=3
+"""
+
+
+def assert_same_histogram(histogram, other):
+    for field in ('centers', 'edges', 'contents', 'errors'):
+        np.testing.assert_array_equal(getattr(histogram, field),
+                                      getattr(other, field))
+    assert histogram.total == other.total
+
+
+def test_parse_flux_text():
+    histogram = parse_flux_text(DUMP)
+    np.testing.assert_array_equal(histogram.centers,
+                                  [-0.05, 0.05, 0.15, 0.25, 0.35])
+    np.testing.assert_allclose(histogram.edges,
+                               [-0.1, 0.0, 0.1, 0.2, 0.3, 0.4],
+                               rtol=0.0, atol=1e-15)
+    np.testing.assert_array_equal(histogram.contents, [0, 1.5, 2.5, 3.5, 9])
+    np.testing.assert_array_equal(histogram.errors,
+                                  [0, 0.5, 0.125, 0.75, 3])
+    assert histogram.total == 7.5
+
+
+def test_regex_fallback():
+    assert_same_histogram(parse_flux_text(LOOSE_DUMP),
+                          parse_flux_text(DUMP))
+
+
+def test_total_without_header():
+    histogram = parse_flux_text(DUMP.split('\n', 1)[1])
+    # between the underflow and overflow bins, as TH1 sums it
+    assert histogram.total == 1.5 + 2.5 + 3.5
+
+
+@pytest.mark.parametrize('flux_file', ['electron_antinu_flux.txt',
+                                       'electron_nu_flux.txt',
+                                       'muon_antinu_flux.txt',
+                                       'muon_nu_flux.txt'])
+def test_flux_files(flux_file):
+    file_name = os.path.join(PACKAGE_DIR, flux_file)
+    histogram = read_flux_text(file_name)
+    with open(file_name) as f:
+        text = f.read()
+    # every line through the regex
+    table = np.array(_flux_line.findall(text), dtype=np.float64)
+    assert len(table) == len(histogram.contents) > 2
+    np.testing.assert_array_equal(histogram.contents, table[:, 0])
+    np.testing.assert_array_equal(histogram.centers, table[:, 1])
+    np.testing.assert_array_equal(histogram.errors, table[:, 2])
+    assert np.all(np.diff(histogram.edges) > 0)
+
+
+@pytest.mark.parametrize('method', ['gaussian', 'poisson'])
+def test_toy_moments(method):
+    histogram = parse_flux_text(DUMP)
+    toys = flux_toys(histogram, 40000, method, seed=1)
+    assert toys.shape == (40000, 5)
+    assert np.all(toys >= 0.0)
+    # bins without an error don't move
+    np.testing.assert_array_equal(toys[:, 0], 0.0)
+    # the others scatter by their error around their content (the first
+    # two are too close to zero for the gaussian clipping to go unnoticed)
+    bins = slice(2, None) if method == 'gaussian' else slice(1, None)
+    contents = histogram.contents[bins]
+    errors = histogram.errors[bins]
+    assert np.all(np.abs(toys[:, bins].mean(axis=0) - contents) <
+                  5 * errors / np.sqrt(len(toys)))
+    np.testing.assert_allclose(toys[:, bins].std(axis=0), errors,
+                               rtol=0.03)
+
+
+def test_poisson_toys_are_scaled_counts():
+    histogram = parse_flux_text(DUMP)
+    toys = flux_toys(histogram, 100, 'poisson', seed=2)
+    # 9 +- 3 is 9 effective entries of weight 1
+    counts = toys[:, 4]
+    np.testing.assert_array_equal(counts, np.round(counts))
+    # 2.5 +- 0.125 is 400 entries of weight 1/160
+    np.testing.assert_allclose(toys[:, 2] * 160,
+                               np.round(toys[:, 2] * 160), atol=1e-9)
+
+
+@pytest.mark.parametrize('method', ['gaussian', 'poisson'])
+def test_toy_seeds(method):
+    histogram = parse_flux_text(DUMP)
+    toys = flux_toys(histogram, 50, method, seed=7)
+    np.testing.assert_array_equal(flux_toys(histogram, 50, method, seed=7),
+                                  toys)
+    assert not np.array_equal(flux_toys(histogram, 50, method, seed=8),
+                              toys)
+
+
+def test_unknown_toy_method():
+    with pytest.raises(ValueError):
+        flux_toys(parse_flux_text(DUMP), 10, 'uniform')
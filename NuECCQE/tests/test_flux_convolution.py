@@ -0,0 +1,284 @@
+"""
+The vectorized flux convolution gives the answers of the original bin by
+bin loop, window_scan those of convolve over each window, and the file
+caches notice changed files.
+"""
+from optparse import OptionParser
+import os
+
+import numpy as np
+import pytest
+
+from genieutils.flux_convolution import (LRUCache, convolve,
+                                         convolve_universes,
+                                         load_xsec_table, lookup_xsecs,
+                                         toy_summaries, window_grid,
+                                         window_list, window_scan,
+                                         xsec_cache)
+from genieutils.flux import FluxHistogram, edges_from_centers
+from genieutils.reader import xml_to_list_of_dicts
+
+
+def findxs(en, xsecs):
+    # the original per-bin binary search over (energy, xsec) pairs
+    low_idx = 0
+    high_idx = len(xsecs) - 1
+    mid_idx = int((high_idx + low_idx) / 2)
+    energy = xsecs[mid_idx][0]
+    while high_idx - low_idx > 1:
+        if en > energy:
+            low_idx = mid_idx
+            mid_idx = int((high_idx + low_idx) / 2)
+            energy = xsecs[mid_idx][0]
+        elif en < energy:
+            high_idx = mid_idx
+            mid_idx = int((high_idx + low_idx) / 2)
+            energy = xsecs[mid_idx][0]
+        else:
+            break
+
+    return xsecs[mid_idx][1]
+
+
+def loop_convolve(bin_xs, counts, energies, xsecs, emin, emax):
+    # the original fconvolve loop, on arrays instead of files
+    table = list(zip(energies, xsecs))
+    bin_lows = []
+    selected = []
+    for bin_low, count in zip(bin_xs, counts):
+        if bin_low < emin or bin_low > emax:
+            continue
+        bin_lows.append(bin_low)
+        selected.append(count)
+    total = sum(selected)
+    total_xsec = 0.0
+    for low, high, count in zip(bin_lows[:-1], bin_lows[1:], selected):
+        total_xsec += findxs((high + low) / 2.0, table) * count / total
+    return total_xsec
+
+
+@pytest.fixture
+def tables(spline_file):
+    return [(s.energies, s.xsecs) for s in xml_to_list_of_dicts(spline_file)]
+
+
+@pytest.fixture
+def flux():
+    # a TH1.Print("all") like binning: underflow, 0.1 GeV bins, overflow
+    rng = np.random.RandomState(3)
+    bin_xs = np.round(np.arange(-0.05, 100.1, 0.1), 2)
+    counts = rng.exponential(1.0, len(bin_xs)) * np.exp(-bin_xs / 10.0)
+    return bin_xs, counts
+
+
+def test_nearest_matches_findxs(tables):
+    rng = np.random.RandomState(5)
+    for energies, xsecs in tables:
+        table = list(zip(energies, xsecs))
+        points = np.concatenate((
+            rng.uniform(-1.0, 1.2 * energies[-1], 500),
+            energies, energies[:3],
+            [energies[0] - 1e-9, energies[-1] + 1e-9]))
+        expected = [findxs(p, table) for p in points]
+        np.testing.assert_array_equal(
+            lookup_xsecs(points, energies, xsecs, 'nearest'), expected)
+
+
+def test_nearest_stacked_channels(tables):
+    energies = tables[0][0]
+    stacked = np.vstack([xsecs for e, xsecs in tables
+                         if np.array_equal(e, energies)])
+    assert len(stacked) > 1
+    points = np.linspace(0.0, 120.0, 301)
+    np.testing.assert_array_equal(
+        lookup_xsecs(points, energies, stacked, 'nearest'),
+        [lookup_xsecs(points, energies, xsecs, 'nearest')
+         for xsecs in stacked])
+
+
+@pytest.mark.parametrize('emin,emax', [(0.0, 120.0), (2.0, 20.0),
+                                       (20.0, 21.0), (0.3, 0.35),
+                                       (150.0, 200.0)])
+def test_convolve_matches_loop(tables, flux, emin, emax):
+    bin_xs, counts = flux
+    for energies, xsecs in tables:
+        expected = loop_convolve(bin_xs, counts, energies, xsecs, emin, emax)
+        assert convolve(bin_xs, counts, energies, xsecs, emin, emax) == \
+            pytest.approx(expected, rel=1e-12, abs=0.0)
+
+
+@pytest.mark.parametrize('emin,emax', [(0.0, 120.0), (2.0, 20.0),
+                                       (150.0, 200.0)])
+def test_convolve_universes_matches_loop(tables, flux, emin, emax):
+    bin_xs, counts = flux
+    rng = np.random.RandomState(7)
+    universes = counts * rng.normal(1.0, 0.1, (20, len(counts)))
+    # one shared grid as a stacked table, plus the others one by one
+    energies = tables[0][0]
+    shared = [xsecs for e, xsecs in tables if np.array_equal(e, energies)]
+    others = [t for t in tables if not np.array_equal(t[0], energies)]
+    assert len(shared) > 1 and others
+    result = convolve_universes(bin_xs, universes,
+                                [(energies, np.vstack(shared))] + others,
+                                emin, emax)
+
+    table = np.array([[convolve(bin_xs, universe, e, xsecs, emin, emax)
+                       for e, xsecs in [(energies, x) for x in shared] +
+                       others] for universe in universes])
+    np.testing.assert_allclose(result.table, table, rtol=1e-12, atol=0.0)
+    np.testing.assert_allclose(result.mean, table.mean(axis=0),
+                               rtol=1e-12, atol=0.0)
+    deviations = table - table.mean(axis=0)
+    np.testing.assert_allclose(
+        result.covariance,
+        deviations.T.dot(deviations) / (len(universes) - 1),
+        rtol=1e-9, atol=1e-300)
+
+
+def flux_histogram(flux, errors):
+    bin_xs, counts = flux
+    return FluxHistogram(bin_xs, edges_from_centers(bin_xs), counts, errors,
+                         counts[1:-1].sum())
+
+
+def test_toy_summaries(tables, flux):
+    bin_xs, counts = flux
+    nominal = [convolve(bin_xs, counts, e, x, 2.0, 20.0) for e, x in tables]
+    # without errors every toy is the nominal flux
+    for summary, expected in zip(
+            toy_summaries(flux_histogram(flux, np.zeros(len(counts))),
+                          tables, 2.0, 20.0, ntoys=10), nominal):
+        assert summary.mean == pytest.approx(expected, rel=1e-12)
+        assert summary.rms < 1e-12 * expected
+        assert summary.percentiles == pytest.approx([expected] * 5,
+                                                    rel=1e-12)
+
+    histogram = flux_histogram(flux, 0.05 * counts)
+    for method in ('gaussian', 'poisson'):
+        summaries = toy_summaries(histogram, tables, 2.0, 20.0, ntoys=500,
+                                  method=method, seed=4)
+        assert toy_summaries(histogram, tables, 2.0, 20.0, ntoys=500,
+                             method=method, seed=4) == summaries
+        for summary, expected in zip(summaries, nominal):
+            if expected == 0.0:
+                continue
+            assert 0.0 < summary.rms < 0.05 * expected
+            assert summary.mean == pytest.approx(expected, rel=0.01)
+            assert summary.percentiles == sorted(summary.percentiles)
+
+
+WINDOWS = [(0.0, 120.0), (2.0, 20.0), (20.0, 21.0), (0.3, 0.35),
+           (0.05, 0.05), (150.0, 200.0), (20.0, 2.0), (-5.0, 0.5),
+           (99.0, 100.05)]
+
+
+@pytest.mark.parametrize('mode', ['nearest', 'linear', 'loglinear',
+                                  'cubic'])
+def test_window_scan_matches_convolve(tables, flux, mode):
+    bin_xs, counts = flux
+    for energies, xsecs in tables:
+        expected = [convolve(bin_xs, counts, energies, xsecs, emin, emax,
+                             mode) for emin, emax in WINDOWS]
+        np.testing.assert_allclose(
+            window_scan(bin_xs, counts, energies, xsecs, WINDOWS, mode),
+            expected, rtol=1e-10, atol=0.0)
+
+
+def test_window_scan_stacked_channels(tables, flux):
+    bin_xs, counts = flux
+    energies = tables[0][0]
+    stacked = np.vstack([xsecs for e, xsecs in tables
+                         if np.array_equal(e, energies)])
+    result = window_scan(bin_xs, counts, energies, stacked, WINDOWS)
+    assert result.shape == (len(WINDOWS), len(stacked))
+    for channel, xsecs in enumerate(stacked):
+        np.testing.assert_allclose(
+            result[:, channel],
+            window_scan(bin_xs, counts, energies, xsecs, WINDOWS),
+            rtol=1e-12, atol=0.0)
+
+
+def parse_windows(callback, value):
+    parser = OptionParser()
+    parser.add_option('-w', type='string', action='callback',
+                      callback=callback, dest='windows')
+    return parser.parse_args(['-w', value])[0].windows
+
+
+def scan_grid(value):
+    return parse_windows(window_grid, value)
+
+
+def test_window_list():
+    assert parse_windows(window_list, '0:120,2:20,20:21') == \
+        [(0, 120), (2, 20), (20, 21)]
+    for bad in ('2-20', 'a:b', '2:3:4', '0:120,', '20:2', '5:5'):
+        with pytest.raises(SystemExit):
+            parse_windows(window_list, bad)
+
+
+def test_scan_grid_windows(tables, flux):
+    assert scan_grid('0,20,5') == [(0, 5), (5, 10), (10, 15), (15, 20)]
+    # a step that doesn't divide the range ends with a shorter window
+    windows = scan_grid('0,20,3')
+    assert windows[-1] == (18, 20)
+    assert len(windows) == 7
+    with pytest.raises(SystemExit):
+        scan_grid('0,20,0')
+
+    bin_xs, counts = flux
+    energies, xsecs = tables[1]
+    np.testing.assert_allclose(
+        window_scan(bin_xs, counts, energies, xsecs, windows),
+        [convolve(bin_xs, counts, energies, xsecs, emin, emax)
+         for emin, emax in windows], rtol=1e-10, atol=0.0)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    # 'b' is now the oldest entry
+    cache.put('c', 3)
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    cache.put('a', 4)
+    cache.put('d', 5)
+    assert cache.get('c', 'gone') == 'gone'
+    assert (cache.get('a'), cache.get('d')) == (4, 5)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def write_xsec_table(file_name, energies, xsecs):
+    with open(file_name, 'w') as f:
+        np.savetxt(f, np.column_stack((energies, xsecs)),
+                   fmt='%.17g:  %.17g x 10^(-38) cm2')
+
+
+def test_xsec_table_cache(spline_file):
+    first, second = xml_to_list_of_dicts(spline_file)[:2]
+    table_file = os.path.join(os.path.dirname(spline_file), 'xsecs.txt')
+    write_xsec_table(table_file, first.energies, first.xsecs)
+    xsec_cache.clear()
+
+    energies, xsecs = load_xsec_table(table_file)
+    np.testing.assert_array_equal(energies, first.energies)
+    np.testing.assert_array_equal(xsecs, first.xsecs)
+    assert not xsecs.flags.writeable
+    assert load_xsec_table(table_file)[1] is xsecs
+    assert len(xsec_cache) == 1
+
+    # touching the file is enough to read it again
+    st = os.stat(table_file)
+    os.utime(table_file, (st.st_atime, st.st_mtime + 10))
+    assert load_xsec_table(table_file)[1] is not xsecs
+
+    # as is a change of size, whatever the mtime
+    write_xsec_table(table_file, second.energies[:5], second.xsecs[:5])
+    os.utime(table_file, (st.st_atime, st.st_mtime + 10))
+    np.testing.assert_array_equal(load_xsec_table(table_file)[1],
+                                  second.xsecs[:5])
+    xsec_cache.clear()
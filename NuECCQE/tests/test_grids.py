@@ -0,0 +1,63 @@
+"""
+Splines are summed on their own grid when they share one and on the union
+of the grids when they don't.
+"""
+import numpy as np
+
+from genieutils.add_cross_sections import sum_cross_section_dicts
+from genieutils.grids import (common_grid, grid_fingerprint, spline_grid,
+                              sum_splines)
+from genieutils.reader import xml_to_list_of_dicts
+
+
+def test_grid_fingerprint(spline_file):
+    splines = xml_to_list_of_dicts(spline_file)
+    grids = set(spline_grid(s) for s in splines)
+    assert len(grids) == 2
+    assert splines[0].grid == grid_fingerprint(list(splines[0].energies))
+    assert grid_fingerprint(splines[0].energies) != \
+        grid_fingerprint(splines[0].energies[:-1])
+
+
+def test_sum_on_one_grid(spline_file):
+    splines = xml_to_list_of_dicts(spline_file)[:4]
+    energies, xsecs = sum_splines([s.energies for s in splines],
+                                  [s.xsecs for s in splines])
+    np.testing.assert_array_equal(energies, splines[0].energies)
+    np.testing.assert_allclose(xsecs, splines[0].xsecs + splines[1].xsecs +
+                               splines[2].xsecs + splines[3].xsecs,
+                               rtol=1e-15, atol=0.0)
+
+
+def test_sum_on_mixed_grids(spline_file):
+    splines = xml_to_list_of_dicts(spline_file)
+    grid = common_grid([s.energies for s in splines])
+    assert len(grid) > max(len(s.energies) for s in splines)
+    # each spline resampled onto the union of the knots, zero outside its
+    # own knot range
+    expected = np.zeros(len(grid))
+    for s in splines:
+        inside = (grid >= s.energies[0]) & (grid <= s.energies[-1])
+        expected += np.where(inside, np.interp(grid, s.energies, s.xsecs),
+                             0.0)
+
+    for total in (sum_splines([s.energies for s in splines],
+                              [s.xsecs for s in splines]),
+                  sum_cross_section_dicts(splines)):
+        np.testing.assert_array_equal(total[0], grid)
+        np.testing.assert_allclose(total[1], expected, rtol=1e-12,
+                                   atol=0.0)
+    assert sum_cross_section_dicts([]) is None
+
+
+def test_sum_with_a_shorter_grid(spline_file):
+    first, second = xml_to_list_of_dicts(spline_file)[:2]
+    energies, xsecs = sum_splines([first.energies, second.energies[2:8]],
+                                  [first.xsecs, second.xsecs[2:8]])
+    np.testing.assert_array_equal(energies, first.energies)
+    # the shorter spline only counts within its own knots
+    inside = np.zeros(len(energies), dtype=bool)
+    inside[2:8] = True
+    np.testing.assert_allclose(
+        xsecs, first.xsecs + np.where(inside, second.xsecs, 0.0),
+        rtol=1e-15, atol=0.0)
@@ -0,0 +1,89 @@
+"""
+The event rate matrix matches a channel by channel product and leaves out
+the underflow and overflow bins of the fluxes.
+"""
+import numpy as np
+import pytest
+
+from genieutils.add_cross_sections import bucket_splines
+from genieutils.flux_convolution import FLUX_FILES, lookup_xsecs
+from genieutils.pipeline import FLAVORS, GROUPS, group_splines, xsec_table
+from genieutils.rates import (ATOMIC_MASS_UNIT, main, mass_number,
+                              rate_matrix, target_nuclei)
+from genieutils.reader import xml_to_list_of_dicts
+
+
+def test_target_nuclei():
+    assert mass_number(1000060120) == 12
+    assert mass_number('1000010010') == 1
+    assert mass_number(1000180400) == 40
+    assert target_nuclei(1000060120, 12 * ATOMIC_MASS_UNIT * 1e6) == \
+        pytest.approx(1e6)
+
+
+def test_rate_matrix(spline_file):
+    splines = xml_to_list_of_dicts(spline_file)
+    tables = [(s.energies, s.xsecs * 1e38) for s in splines]
+    rng = np.random.RandomState(2)
+    bin_xs = np.arange(0.05, 30.0, 0.1)
+    fluxes = rng.uniform(0.0, 1e-8, (len(tables), len(bin_xs)))
+    nuclei = rng.uniform(1e28, 1e30, len(tables))
+    for mode in ('nearest', 'cubic'):
+        rates = rate_matrix(bin_xs, fluxes, tables, nuclei, 1e20, mode)
+        assert rates.shape == fluxes.shape
+        for c, (energies, xsecs) in enumerate(tables):
+            np.testing.assert_allclose(
+                rates[c], 1e20 * 1e-38 * nuclei[c] * fluxes[c] *
+                lookup_xsecs(bin_xs, energies, xsecs, mode),
+                rtol=1e-14, atol=0.0)
+
+
+def write_flux(file_name, centers, contents):
+    with open(file_name, 'w') as f:
+        f.write('TH1.Print Name  = flux, Entries= 100, Total sum= %.17g\n' %
+                float(contents[1:-1].sum()))
+        for i, (x, content) in enumerate(zip(centers, contents)):
+            f.write(' fSumw[%d]=%.17g, x=%.17g, error=0\n' % (i, content, x))
+
+
+def test_flows_are_left_out(spline_file, tmpdir, capsys):
+    # give the first spline a muon neutrino partner, so CC Hydrogen has
+    # splines for all four flavors
+    with open(spline_file) as f:
+        text = f.read()
+    first = text[text.index('<spline '):text.index('</spline>') + 9]
+    with open(spline_file, 'w') as f:
+        f.write(text.replace(first, first + '\n\n' +
+                             first.replace('nu:-12;', 'nu:12;')))
+    splines = xml_to_list_of_dicts(spline_file)
+
+    centers = np.round(np.arange(-0.25, 20.5, 0.5), 2)
+    contents = np.linspace(1.0, 2.0, len(centers)) * 1e-9
+    # flow bins that would dominate the rates if they were used
+    contents[0] = contents[-1] = 1.0
+    flux_files = [str(tmpdir.join(name)) for name in FLUX_FILES]
+    for flux_file in flux_files:
+        write_flux(flux_file, centers, contents)
+
+    output = str(tmpdir.join('rates.npz'))
+    main(['-s', spline_file, '-t', '1000010010:450', '-p', '1e20',
+          '--flux-area', 'cm2', '-f', ','.join(flux_files), '-o', output,
+          '--no-cache'])
+    capsys.readouterr()
+    result = np.load(output)
+    np.testing.assert_array_equal(result['centers'], centers[1:-1])
+    np.testing.assert_allclose(result['edges'],
+                               np.arange(0.0, 20.5, 0.5), atol=1e-12)
+    assert list(result['flavors']) == FLAVORS
+    assert list(result['targets']) == [1000010010] * 4
+
+    buckets = bucket_splines(splines)
+    group = [g for g in GROUPS if g.title == 'CC Hydrogen'][0]
+    nuclei = target_nuclei(1000010010, 450.0)
+    for rates, flavor in zip(result['rates'], FLAVORS):
+        energies, xsecs = xsec_table(group_splines(buckets, group,
+                                                   flavor))
+        np.testing.assert_allclose(
+            rates, 1e20 * 1e-38 * nuclei * contents[1:-1] *
+            lookup_xsecs(centers[1:-1], energies, xsecs),
+            rtol=1e-12, atol=0.0)
@@ -0,0 +1,176 @@
+"""
+The cached, indexed, chunked and compressed readers give the same Splines as
+plainly parsing the xml.
+"""
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from genieutils.cache import cache_path, iter_cached_splines, read_meta
+from genieutils.chunked import iter_chunked_splines
+from genieutils.files import is_compressed, open_spline_file
+from genieutils.index import (index_path, iter_indexed_splines, load_index,
+                              scan_splines)
+from genieutils.query import SplineQuery
+from genieutils.reader import (iter_spline_files, iter_xsec_dicts,
+                               process_spline, xml_to_list_of_dicts)
+from genieutils.spline import FIELDS
+
+
+def assert_same_splines(splines, expected):
+    splines = list(splines)
+    assert [s.name for s in splines] == [s.name for s in expected]
+    for spline, other in zip(splines, expected):
+        assert spline.energies.dtype == np.float64
+        assert spline.xsecs.dtype == np.float64
+        np.testing.assert_array_equal(spline.energies, other.energies)
+        np.testing.assert_array_equal(spline.xsecs, other.xsecs)
+        assert (spline.algorithm, spline.config, spline.nu, spline.tgt,
+                spline.nucleon, spline.proc, spline.current,
+                spline.hmult) == \
+            (other.algorithm, other.config, other.nu, other.tgt,
+             other.nucleon, other.proc, other.current, other.hmult)
+
+
+def test_fixture_parses(spline_file):
+    splines = xml_to_list_of_dicts(spline_file)
+    assert len(splines) == 7
+    assert all(len(s.energies) == len(s.xsecs) > 0 for s in splines)
+
+
+def test_cached_matches_plain(spline_file):
+    plain = xml_to_list_of_dicts(spline_file)
+    # the first read builds the cache as it goes, the second maps it
+    assert_same_splines(iter_cached_splines(spline_file, iter_xsec_dicts),
+                        plain)
+    assert_same_splines(iter_cached_splines(spline_file, iter_xsec_dicts),
+                        plain)
+    assert_same_splines(iter_spline_files([spline_file]), plain)
+
+
+def test_cache_columns(spline_file):
+    plain = xml_to_list_of_dicts(spline_file)
+    list(iter_cached_splines(spline_file, iter_xsec_dicts))
+    columns = read_meta(spline_file)['columns']
+    assert [tuple(row) for row in zip(*[columns[f] for f in FIELDS])] == \
+        [s.fields for s in plain]
+    query = SplineQuery(flavors=[14, -14], currents=['CC'])
+    assert query.matching_rows(columns) == \
+        [i for i, s in enumerate(plain) if query.matches_spline(s)]
+
+
+def test_stale_cache_is_rebuilt(spline_file):
+    list(iter_cached_splines(spline_file, iter_xsec_dicts))
+    with open(spline_file, 'r') as f:
+        text = f.read()
+    with open(spline_file, 'w') as f:
+        f.write(text.replace('<E>       0.01 </E>', '<E>      0.011 </E>'))
+    assert_same_splines(iter_cached_splines(spline_file, iter_xsec_dicts),
+                        xml_to_list_of_dicts(spline_file))
+
+
+def test_indexed_matches_plain(spline_file):
+    plain = xml_to_list_of_dicts(spline_file)
+    encoding, entries = load_index(spline_file)
+    assert encoding == 'ISO-8859-1'
+    assert [e.name for e in entries] == [s.name for s in plain]
+    assert [e.nknots for e in entries] == [len(s.energies) for s in plain]
+    assert_same_splines(
+        (process_spline(s) for s in
+         iter_indexed_splines(spline_file, entries, encoding)), plain)
+
+    # only the selected blocks, read back from the sidecar this time
+    query = SplineQuery(flavors=[14, -14], currents=['CC'])
+    wanted = [e for e in load_index(spline_file)[1] if query.matches(e.name)]
+    assert_same_splines(
+        (process_spline(s) for s in
+         iter_indexed_splines(spline_file, wanted, encoding)),
+        [s for s in plain if query.matches_spline(s)])
+
+
+def test_nameless_spline_is_reported(spline_file):
+    with open(spline_file, 'rb') as f:
+        data = f.read()
+    offset = data.index(b'<spline ', data.index(b'<spline ') + 1)
+    end = data.index(b'>', offset)
+    with open(spline_file, 'wb') as f:
+        f.write(data[:offset] + b'<spline nknots="12"' + data[end:])
+    with pytest.raises(ValueError) as error:
+        scan_splines(spline_file)
+    assert 'byte {0} of {1}'.format(offset, spline_file) in \
+        str(error.value)
+    with pytest.raises(ValueError):
+        load_index(spline_file)
+    assert not os.path.exists(index_path(spline_file))
+
+
+def test_query_matches_plain(spline_file):
+    plain = xml_to_list_of_dicts(spline_file)
+    for query in (SplineQuery(algorithms=['ReinDFRPXSec'], currents=['NC']),
+                  SplineQuery(flavors=[14, -14], targets=[1000060120]),
+                  SplineQuery(nucleons=[2112]),
+                  SplineQuery(hmults=['(p=0,n=0,pi+=0,pi-=1,pi0=0)'])):
+        expected = [s for s in plain if query.matches_spline(s)]
+        assert expected
+        assert [query.matches(s.name) for s in plain] == \
+            [query.matches_spline(s) for s in plain]
+        # through the index, and through the cache once it exists
+        assert_same_splines(iter_spline_files([spline_file], query,
+                                              use_cache=False), expected)
+        assert_same_splines(iter_spline_files([spline_file], query),
+                            expected)
+        assert_same_splines(iter_spline_files([spline_file], query),
+                            expected)
+
+
+def test_chunked_matches_plain(spline_file):
+    plain = xml_to_list_of_dicts(spline_file)
+    for jobs in (1, 2, 3):
+        assert_same_splines(iter_chunked_splines(spline_file, jobs=jobs),
+                            plain)
+        assert_same_splines(iter_spline_files([spline_file], jobs=jobs,
+                                              use_cache=False), plain)
+    query = SplineQuery(targets=[1000060120])
+    assert_same_splines(iter_spline_files([spline_file], query, jobs=2,
+                                          use_cache=False),
+                        [s for s in plain if query.matches_spline(s)])
+
+
+def test_sidecars_are_written(spline_file):
+    list(iter_spline_files([spline_file], SplineQuery(flavors=[14]),
+                           use_cache=False))
+    assert os.path.isfile(index_path(spline_file))
+    assert not os.path.exists(cache_path(spline_file))
+    list(iter_spline_files([spline_file]))
+    assert os.path.isdir(cache_path(spline_file))
+
+
+@pytest.mark.parametrize('suffix,module', [('.gz', 'gzip'), ('.bz2', 'bz2'),
+                                           ('.xz', 'lzma')])
+def test_compressed_matches_plain(spline_file, suffix, module):
+    compressor = pytest.importorskip(module)
+    plain = xml_to_list_of_dicts(spline_file)
+    compressed_file = spline_file + suffix
+    with open(spline_file, 'rb') as f, \
+            compressor.open(compressed_file, 'wb') as out:
+        shutil.copyfileobj(f, out)
+    assert is_compressed(compressed_file)
+    assert not is_compressed(spline_file)
+    with open_spline_file(compressed_file) as f, \
+            open(spline_file, 'rb') as original:
+        assert f.read() == original.read()
+
+    assert_same_splines(xml_to_list_of_dicts(compressed_file), plain)
+    # streamed (and cached) whatever the query or number of jobs
+    query = SplineQuery(targets=[1000060120])
+    for use_cache in (False, True, True):
+        assert_same_splines(
+            iter_spline_files([compressed_file], use_cache=use_cache,
+                              jobs=2), plain)
+        assert_same_splines(
+            iter_spline_files([compressed_file], query, use_cache),
+            [s for s in plain if query.matches_spline(s)])
+    assert not os.path.exists(index_path(compressed_file))
+    assert os.path.isdir(cache_path(compressed_file))
@@ -0,0 +1,59 @@
+"""
+The Spline record decodes its name once, has no per-instance dict and
+survives pickling (as it must to come back from worker processes).
+"""
+import pickle
+
+import numpy as np
+import pytest
+
+from genieutils.reader import xml_to_list_of_dicts
+from genieutils.spline import CC, NC, UNKNOWN_CURRENT, Spline
+
+
+def test_decoded_fields(spline_file):
+    splines = xml_to_list_of_dicts(spline_file)
+    nc = splines[3]
+    assert (nc.algorithm, nc.config, nc.nu, nc.tgt, nc.nucleon) == \
+        ('ReinDFRPXSec', 'Default', 14, 1000010010, 2212)
+    assert (nc.proc, nc.current) == ('Weak[NC],DFR', NC)
+    assert nc.hmult == '(p=0,n=0,pi+=0,pi-=0,pi0=1)'
+    assert (nc.flavor, nc.current_name, nc.target) == \
+        ('Muon Neutrino', 'NC', 'Hydrogen')
+    # no struck nucleon or hmult in the coherent and DIS names
+    assert (splines[4].nucleon, splines[4].current) == (0, CC)
+    assert splines[6].hmult == ''
+    # the strings are shared between the splines of a file
+    assert splines[0].algorithm is splines[1].algorithm
+    assert splines[0].proc is splines[1].proc
+    assert Spline('genie::A/B/nu:14;tgt:1;', [], []).current == \
+        UNKNOWN_CURRENT
+
+
+def test_no_instance_dict(spline_file):
+    spline = xml_to_list_of_dicts(spline_file)[0]
+    assert not hasattr(spline, '__dict__')
+    with pytest.raises(AttributeError):
+        spline.flux = 1.0
+
+
+@pytest.mark.parametrize('protocol', range(pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle(spline_file, protocol):
+    splines = xml_to_list_of_dicts(spline_file)
+    copies = pickle.loads(pickle.dumps(splines, protocol))
+    for spline, copy in zip(splines, copies):
+        assert type(copy) is Spline
+        assert copy.name == spline.name
+        assert copy.fields == spline.fields
+        np.testing.assert_array_equal(copy.energies, spline.energies)
+        np.testing.assert_array_equal(copy.xsecs, spline.xsecs)
+        assert copy.grid is None
+
+
+def test_from_fields(spline_file):
+    for spline in xml_to_list_of_dicts(spline_file):
+        copy = Spline.from_fields(spline.name, spline.fields,
+                                  spline.energies, spline.xsecs)
+        assert copy.fields == spline.fields
+        assert copy.description == spline.description
+        assert copy.algorithm is spline.algorithm